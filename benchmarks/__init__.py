@@ -0,0 +1 @@
+"""Benchmarks on synthetic data; see the README for how to run them."""
@@ -0,0 +1,109 @@
+"""Synthetic submissions for the benchmarks.
+
+Plant names and uses are drawn with skewed weights, so some words are in a
+large share of the rows and others in only a few, like in real archives.
+With located=True every row gets coordinates spread over southern India.
+
+Usage:
+    python -m benchmarks.corpus corpus.db [--rows 100000] [--located]
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+
+from plantspeak import db, submissions
+
+PLANTS = [
+    ('Tulsi', 'Ocimum tenuiflorum'), ('Neem', 'Azadirachta indica'), ('Turmeric', 'Curcuma longa'),
+    ('Ginger', 'Zingiber officinale'), ('Aloe vera', 'Aloe barbadensis'), ('Amla', 'Phyllanthus emblica'),
+    ('Brahmi', 'Bacopa monnieri'), ('Giloy', 'Tinospora cordifolia'), ('Moringa', 'Moringa oleifera'),
+    ('Curry leaf', 'Murraya koenigii'), ('Ashwagandha', 'Withania somnifera'), ('Vetiver', 'Chrysopogon zizanioides'),
+    ('Shatavari', 'Asparagus racemosus'), ('Guduchi', 'Tinospora cordifolia'), ('Kalmegh', 'Andrographis paniculata'),
+]
+USES = [
+    'fever', 'cough', 'cold', 'digestion', 'skin rash', 'wounds', 'headache', 'joint pain',
+    'diabetes', 'hair care', 'sore throat', 'insect bites', 'sleep', 'memory', 'snakebite',
+]
+PREPARATIONS = ['boiled in water', 'ground into a paste', 'dried and powdered', 'mixed with honey', 'eaten raw']
+CATEGORIES = ['Medicinal', 'Food / Cooking', 'Ritual / Spiritual', 'Other']
+COMMUNITIES = ['Telugu', 'Tamil', 'Kannada', 'Malayalam', 'Marathi', 'Hindi']
+PLACES = ['Guntur', 'Madurai', 'Mysuru', 'Kochi', 'Pune', 'Warangal', 'Salem', 'Hubli', 'Thrissur', 'Nagpur']
+CONSENTS = ['Yes, I give permission', 'Yes, I give permission (anonymously)', 'No, keep private']
+# Southern India, (south, west, north, east)
+REGION = (8.0, 74.0, 20.0, 84.0)
+CHUNK_SIZE = 10000
+
+_COLUMNS = [
+    'id', 'user_id', 'submission_time', 'plant_name', 'scientific_name', 'category', 'usage_desc',
+    'prep_method', 'community', 'tags', 'location', 'language', 'latitude', 'longitude', 'consent',
+]
+
+
+def _weights(n):
+    """Zipf-like weights, so the first items are common and the last rare"""
+    return [1 / (rank + 1) ** 1.5 for rank in range(n)]
+
+
+def _rows(count, users, located, rng):
+    plant_weights = _weights(len(PLANTS))
+    use_weights = _weights(len(USES))
+    start = datetime(2020, 1, 1)
+    for n in range(count):
+        plant, scientific = rng.choices(PLANTS, plant_weights)[0]
+        uses = sorted(set(rng.choices(USES, use_weights, k=2)))
+        community = rng.choice(COMMUNITIES)
+        lat = lon = None
+        if located:
+            south, west, north, east = REGION
+            lat, lon = rng.uniform(south, north), rng.uniform(west, east)
+        yield (
+            f'b{n:07d}', rng.randint(1, users),
+            (start + timedelta(minutes=n * 3)).strftime("%Y-%m-%d %H:%M:%S"),
+            plant, scientific, rng.choice(CATEGORIES),
+            f"Used for {' and '.join(uses)}", rng.choice(PREPARATIONS), community, ', '.join(uses),
+            rng.choice(PLACES), community, lat, lon, rng.choices(CONSENTS, [4, 4, 1])[0],
+        )
+
+
+def build(path, rows, users=1000, located=False, seed=0):
+    """Create a database at path with users and rows synthetic submissions"""
+    rng = random.Random(seed)
+    db.migrate(path)
+    insert = f"INSERT INTO submissions ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' for _ in _COLUMNS)})"
+    with db.transaction(path) as conn:
+        conn.executemany(
+            'INSERT INTO users (username, password) VALUES (?, ?)',
+            [(f'user{n}', 'not a real hash') for n in range(1, users + 1)]
+        )
+    chunk = []
+    for row in _rows(rows, users, located, rng):
+        chunk.append(row)
+        if len(chunk) == CHUNK_SIZE:
+            _insert(path, insert, chunk)
+            chunk = []
+    if chunk:
+        _insert(path, insert, chunk)
+
+
+def _insert(path, insert, chunk):
+    with db.transaction(path) as conn:
+        conn.executemany(insert, chunk)
+        for row in chunk:
+            submissions.save_terms(conn, row[0], row[5], row[9])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write synthetic submissions to a new database")
+    parser.add_argument('path', help="database to create")
+    parser.add_argument('--rows', type=int, default=100000, help="submissions (default: %(default)s)")
+    parser.add_argument('--users', type=int, default=1000, help="users (default: %(default)s)")
+    parser.add_argument('--located', action='store_true', help="give every submission coordinates")
+    args = parser.parse_args(argv)
+
+    build(args.path, args.rows, args.users, args.located)
+    print(f"Wrote {args.rows} submissions by {args.users} users to {args.path}")
+    db.close_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Queries per second through the connection pool against a connection per call.
+
+Before plantspeak.db, every helper opened its own SQLite connection. This
+runs the same indexed user lookup both ways.
+
+Usage:
+    python -m benchmarks.pool [--queries 20000] [--users 1000]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from benchmarks import corpus
+from plantspeak import db
+
+LOOKUP = 'SELECT id, username, name, role FROM users WHERE username = ?'
+
+
+def connect_per_call(path, usernames):
+    for username in usernames:
+        conn = sqlite3.connect(path, timeout=5)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute(LOOKUP, (username,)).fetchone()
+        finally:
+            conn.close()
+
+
+def pooled(path, usernames):
+    for username in usernames:
+        with db.connection(path) as conn:
+            conn.execute(LOOKUP, (username,)).fetchone()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time pooled connections against a connection per query")
+    parser.add_argument('--queries', type=int, default=20000, help="lookups per run (default: %(default)s)")
+    parser.add_argument('--users', type=int, default=1000, help="users in the database (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    path = os.path.join(tempfile.mkdtemp(), 'pool.db')
+    corpus.build(path, rows=0, users=args.users)
+    rng = random.Random(0)
+    usernames = [f'user{rng.randint(1, args.users)}' for _ in range(args.queries)]
+
+    for label, run in (('connect-per-call', connect_per_call), ('pooled', pooled)):
+        started = time.perf_counter()
+        run(path, usernames)
+        seconds = time.perf_counter() - started
+        print(f"{label:18} {args.queries / seconds:9.0f} queries/s")
+    db.close_all()
+
+
+if __name__ == '__main__':
+    main()
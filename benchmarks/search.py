@@ -0,0 +1,87 @@
+"""Full-text search through FTS5 against pandas str.contains.
+
+Before the FTS5 index, the browse tab loaded every visible submission into
+a DataFrame on each rerun and filtered it with str.contains. This times a
+search page and its count through the index against that filter (and the
+load it needed) on a synthetic corpus, for a logged-in user.
+
+Usage:
+    python -m benchmarks.search [--db search.db] [--rows 100000]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks import corpus
+from plantspeak import db, submissions
+
+# A rare plant and a use most rows mention
+TERMS = {
+    'selective': corpus.PLANTS[-1][0],
+    'broad': corpus.USES[0],
+}
+SEARCHED_COLUMNS = ['plant_name', 'scientific_name', 'usage_desc', 'prep_method', 'tags', 'community', 'location']
+REPEATS = 5
+
+
+def timed(fn, repeats=REPEATS):
+    """Median seconds of fn() over repeats calls, and its last result"""
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times), result
+
+
+def load_frame(user_id):
+    """Every submission the user can see, as the browse tab used to load them"""
+    query = submissions.SubmissionQuery(user_id)
+    selects, params = [], []
+    for where, branch_params in query.branches():
+        selects.append(f'SELECT s.* FROM submissions s WHERE {where}')
+        params.extend(branch_params)
+    with db.connection() as conn:
+        return pd.read_sql_query(' UNION ALL '.join(selects), conn, params=params)
+
+
+def pandas_search(frame, term):
+    matched = pd.Series(False, index=frame.index)
+    for column in SEARCHED_COLUMNS:
+        matched |= frame[column].str.contains(term, case=False, na=False, regex=False)
+    return frame[matched]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time FTS5 search against pandas str.contains")
+    parser.add_argument('--db', help="corpus database, built if missing (default: a temporary file)")
+    parser.add_argument('--rows', type=int, default=100000, help="submissions in a new corpus (default: %(default)s)")
+    parser.add_argument('--user', type=int, default=1, help="id of the logged-in user (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), 'search.db')
+    if not os.path.exists(path):
+        print(f"Building a corpus of {args.rows} submissions in {path}")
+        corpus.build(path, args.rows)
+    db.DB_PATH = path
+    db.migrate(path)
+
+    load_seconds, frame = timed(lambda: load_frame(args.user), repeats=3)
+    print(f"Loading {len(frame)} visible submissions into pandas: {load_seconds * 1000:.0f} ms")
+    for label, term in TERMS.items():
+        query = submissions.SubmissionQuery(args.user).search(term)
+        page_seconds, _ = timed(lambda: submissions.fetch_page(query))
+        count_seconds, hits = timed(lambda: submissions.count(query))
+        pandas_seconds, matched = timed(lambda: pandas_search(frame, term))
+        print(f"{label} term {term!r} ({hits} hits, pandas {len(matched)}):")
+        print(f"  FTS page {page_seconds * 1000:.1f} ms + count {count_seconds * 1000:.1f} ms; "
+              f"pandas str.contains {pandas_seconds * 1000:.0f} ms")
+    db.close_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Map queries through the R*Tree against a full scan.
+
+Times radius and viewport queries for an anonymous visitor on a synthetic
+corpus with coordinates spread over southern India, and the same radius
+query done by reading every located submission and computing its
+distance, as it had to be without the spatial index.
+
+Usage:
+    python -m benchmarks.spatial [--db spatial.db] [--rows 1000000]
+"""
+import argparse
+import os
+import tempfile
+
+from benchmarks import corpus
+from benchmarks.search import timed
+from plantspeak import db, geo, spatial, submissions
+
+# Guntur
+CENTRE = (16.31, 80.44)
+RADII = [5, 25, 100]
+
+
+def full_scan(query, lat, lon, radius_km):
+    branches = query.branches()
+    where = ' OR '.join(f'({w})' for w, _ in branches)
+    params = [p for _, branch_params in branches for p in branch_params]
+    with db.connection() as conn:
+        rows = conn.execute(
+            f'SELECT s.* FROM submissions s WHERE s.latitude IS NOT NULL AND ({where})', params
+        ).fetchall()
+    return [row for row in rows if geo.haversine_km(lat, lon, row['latitude'], row['longitude']) <= radius_km]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time spatial index queries against a full scan")
+    parser.add_argument('--db', help="corpus database, built if missing (default: a temporary file)")
+    parser.add_argument('--rows', type=int, default=1000000, help="submissions in a new corpus (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), 'spatial.db')
+    if not os.path.exists(path):
+        print(f"Building a corpus of {args.rows} located submissions in {path}")
+        corpus.build(path, args.rows, located=True)
+    db.DB_PATH = path
+    db.migrate(path)
+
+    query = submissions.SubmissionQuery()
+    lat, lon = CENTRE
+    for radius in RADII:
+        seconds, rows = timed(lambda: spatial.nearby(query, lat, lon, radius))
+        print(f"radius {radius:3} km: {seconds * 1000:8.1f} ms ({len(rows)} matches)")
+    view = spatial.bbox_around(lat, lon, 100)
+    seconds, (points, total) = timed(lambda: spatial.points_in_view(query, *view))
+    print(f"viewport 100 km box: {seconds * 1000:.1f} ms ({len(points)} of {total} points)")
+    seconds, rows = timed(lambda: full_scan(query, lat, lon, 25), repeats=1)
+    print(f"full scan + haversine for 25 km: {seconds * 1000:.0f} ms ({len(rows)} matches)")
+    db.close_all()
+
+
+if __name__ == '__main__':
+    main()
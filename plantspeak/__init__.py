@@ -0,0 +1 @@
+"""PlantSpeak application package"""
@@ -0,0 +1,226 @@
+"""Processing of voice recordings.
+
+Recordings are probed for their format and duration and re-encoded to a
+compact speech codec: Opus at SPEECH_BITRATE in an Ogg container when
+ffmpeg is installed (it is listed in packages.txt for Streamlit Cloud).
+Without ffmpeg, PCM WAV files are still downmixed to mono and resampled
+to FALLBACK_RATE with numpy, and other formats are kept as they are. A
+list of peak levels is computed for drawing a waveform.
+"""
+import json
+import math
+import os
+import shutil
+import subprocess
+import tempfile
+import wave
+
+import numpy as np
+
+from plantspeak import db, media
+
+SPEECH_BITRATE = '24k'
+# Sample rate of WAV files resampled without ffmpeg; plenty for speech
+FALLBACK_RATE = 16000
+# Points in a waveform preview
+WAVEFORM_POINTS = 200
+# Seconds allowed for ffmpeg to process one recording
+FFMPEG_TIMEOUT = 300
+
+MIME_TYPES = {
+    '.wav': 'audio/wav',
+    '.mp3': 'audio/mpeg',
+    '.m4a': 'audio/mp4',
+    '.ogg': 'audio/ogg',
+    '.opus': 'audio/ogg',
+}
+
+
+def mime_type(path):
+    """The MIME type to play a recording with, from its extension"""
+    return MIME_TYPES.get(os.path.splitext(path or '')[1].lower(), 'audio/wav')
+
+
+def ffmpeg_available():
+    return shutil.which('ffmpeg') is not None and shutil.which('ffprobe') is not None
+
+
+def probe(path):
+    """
+    Return {'format', 'duration', 'bitrate', 'sample_rate', 'channels'} for
+    a recording; values that cannot be determined are None.
+    """
+    info = {
+        'format': os.path.splitext(path)[1].lower().lstrip('.') or None,
+        'duration': None, 'bitrate': None, 'sample_rate': None, 'channels': None,
+    }
+    if ffmpeg_available():
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', path],
+            capture_output=True, text=True, timeout=60,
+        )
+        if result.returncode == 0:
+            data = json.loads(result.stdout)
+            fmt = data.get('format', {})
+            stream = next((s for s in data.get('streams', []) if s.get('codec_type') == 'audio'), {})
+            info['format'] = stream.get('codec_name') or info['format']
+            info['duration'] = float(fmt['duration']) if fmt.get('duration') else None
+            info['bitrate'] = int(fmt['bit_rate']) if fmt.get('bit_rate') else None
+            info['sample_rate'] = int(stream['sample_rate']) if stream.get('sample_rate') else None
+            info['channels'] = stream.get('channels')
+            return info
+
+    if info['format'] == 'wav':
+        try:
+            with wave.open(path, 'rb') as w:
+                info['sample_rate'] = w.getframerate()
+                info['channels'] = w.getnchannels()
+                info['duration'] = w.getnframes() / w.getframerate()
+                info['bitrate'] = w.getframerate() * w.getnchannels() * w.getsampwidth() * 8
+        except (wave.Error, EOFError):
+            # Not PCM (e.g. floating point); only ffmpeg can read it
+            pass
+    return info
+
+
+def _read_wav_mono(path):
+    """Return (mono samples as floats in -1..1, sample rate) for a PCM WAV file"""
+    with wave.open(path, 'rb') as w:
+        channels, width, rate = w.getnchannels(), w.getsampwidth(), w.getframerate()
+        frames = w.readframes(w.getnframes())
+
+    if width == 1:
+        # 8-bit WAV is unsigned
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 3:
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3)
+        # Sign-extend 24-bit little-endian samples into 32 bits
+        samples = (raw[:, 0].astype(np.int32) | raw[:, 1].astype(np.int32) << 8
+                   | raw[:, 2].astype(np.int8).astype(np.int32) << 16).astype(np.float32) / 2 ** 23
+    elif width in (2, 4):
+        dtype = '<i2' if width == 2 else '<i4'
+        samples = np.frombuffer(frames, dtype=dtype).astype(np.float32) / 2 ** (8 * width - 1)
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width} bytes")
+
+    if channels > 1:
+        samples = samples[:len(samples) // channels * channels].reshape(-1, channels).mean(axis=1)
+    return samples, rate
+
+
+def _write_wav_mono(samples, rate, path):
+    """Write float samples as a 16-bit mono WAV file"""
+    pcm = (np.clip(samples, -1, 1) * 32767).astype('<i2')
+    with wave.open(path, 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(pcm.tobytes())
+
+
+def _resample(samples, rate, target):
+    """Downsample with a moving-average low-pass filter and linear interpolation"""
+    if rate <= target or len(samples) == 0:
+        return samples
+    width = math.ceil(rate / target)
+    smoothed = np.convolve(samples, np.ones(width, dtype=np.float32) / width, mode='same')
+    times = np.arange(0, len(samples) / rate, 1 / target)
+    return np.interp(times, np.arange(len(samples)) / rate, smoothed).astype(np.float32)
+
+
+def transcode(path):
+    """
+    Write a compact copy of a recording to a temporary file and return its
+    path, or None if there is no way to make one. The caller deletes it.
+    """
+    if ffmpeg_available():
+        fd, out_path = tempfile.mkstemp(suffix='.ogg')
+        os.close(fd)
+        result = subprocess.run(
+            ['ffmpeg', '-y', '-v', 'error', '-i', path, '-vn', '-ac', '1',
+             '-c:a', 'libopus', '-b:a', SPEECH_BITRATE, '-application', 'voip', out_path],
+            capture_output=True, text=True, timeout=FFMPEG_TIMEOUT,
+        )
+        if result.returncode != 0:
+            os.unlink(out_path)
+            raise RuntimeError(f"ffmpeg failed: {result.stderr.strip()}")
+        return out_path
+
+    if path.lower().endswith('.wav'):
+        try:
+            samples, rate = _read_wav_mono(path)
+        except (wave.Error, EOFError):
+            return None
+        fd, out_path = tempfile.mkstemp(suffix='.wav')
+        os.close(fd)
+        _write_wav_mono(_resample(samples, rate, min(rate, FALLBACK_RATE)), min(rate, FALLBACK_RATE), out_path)
+        return out_path
+    return None
+
+
+def waveform(path, points=WAVEFORM_POINTS):
+    """Peak level (0-1) of each of points equal slices of a recording, or None"""
+    if ffmpeg_available():
+        result = subprocess.run(
+            ['ffmpeg', '-v', 'error', '-i', path, '-vn', '-ac', '1', '-ar', '8000', '-f', 's16le', '-'],
+            capture_output=True, timeout=FFMPEG_TIMEOUT,
+        )
+        if result.returncode != 0:
+            return None
+        samples = np.frombuffer(result.stdout[:len(result.stdout) // 2 * 2], dtype='<i2') / 32768
+    elif path.lower().endswith('.wav'):
+        try:
+            samples, _ = _read_wav_mono(path)
+        except (wave.Error, EOFError):
+            return None
+    else:
+        return None
+
+    if len(samples) == 0:
+        return None
+    size = math.ceil(len(samples) / points)
+    padded = np.zeros(size * math.ceil(len(samples) / size), dtype=np.float32)
+    padded[:len(samples)] = np.abs(samples)
+    return [round(float(peak), 3) for peak in padded.reshape(-1, size).max(axis=1)]
+
+
+def process(stored):
+    """
+    Make the compact copy of a stored recording and record its metadata.
+    Returns the StoredMedia to use for playback: the compact copy if it is
+    smaller than the original, otherwise the original.
+    """
+    compact_path = transcode(stored.path)
+    result = stored
+    if compact_path is not None:
+        try:
+            if os.path.getsize(compact_path) < stored.size:
+                with open(compact_path, 'rb') as f:
+                    result = media.store(f, compact_path, mime_type(compact_path))
+        finally:
+            os.unlink(compact_path)
+
+    info = probe(result.path)
+    with db.transaction() as conn:
+        conn.execute(
+            'UPDATE media SET duration = ?, bitrate = ?, sample_rate = ?, channels = ?, waveform = ? '
+            'WHERE sha256 = ?',
+            (info['duration'], info['bitrate'], info['sample_rate'], info['channels'],
+             json.dumps(waveform(result.path)), result.sha256)
+        )
+    return result
+
+
+def metadata(sha256):
+    """Duration, bitrate and waveform recorded for a stored recording, or None"""
+    with db.connection() as conn:
+        row = conn.execute(
+            'SELECT duration, bitrate, waveform FROM media WHERE sha256 = ?', (sha256,)
+        ).fetchone()
+    if row is None or row['duration'] is None:
+        return None
+    return {
+        'duration': row['duration'],
+        'bitrate': row['bitrate'],
+        'waveform': json.loads(row['waveform']) if row['waveform'] else None,
+    }
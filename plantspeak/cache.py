@@ -0,0 +1,71 @@
+"""Per-session memoisation of database reads.
+
+Streamlit reruns the whole script on every widget interaction, so the
+browse tab would otherwise repeat the same queries many times a minute.
+Each session keeps a QueryCache in its session state. Writes call
+invalidate(), which bumps a process-wide generation number and so makes
+every session's cached results stale at once; the TTL bounds how stale a
+result can get when the write happened in another server process.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+# Seconds a cached result may be served for
+DEFAULT_TTL = 60
+# Results kept per session before the least recently used are dropped
+DEFAULT_MAX_ENTRIES = 64
+
+_generation = 0
+_generation_lock = threading.Lock()
+
+
+def invalidate():
+    """Mark every cached result in every session as stale"""
+    global _generation
+    with _generation_lock:
+        _generation += 1
+
+
+class QueryCache:
+    """A small LRU cache of query results with a TTL and hit/miss counters"""
+
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, key, compute):
+        """Return the cached result for key, calling compute() on a miss"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            generation, expires, value = entry
+            if generation == _generation and expires > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+
+        self.misses += 1
+        generation = _generation
+        value = compute()
+        self._entries[key] = (generation, time.monotonic() + self.ttl, value)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        """Drop every cached result"""
+        self._entries.clear()
+
+    def stats(self):
+        """Hit/miss counters for the debug panel"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self._entries),
+        }
@@ -0,0 +1,503 @@
+"""SQLite connection handling for PlantSpeak.
+
+All database access goes through a small pool of long-lived connections
+instead of opening a new connection for every query. Keeping connections
+open lets sqlite3 reuse its prepared statements and avoids re-reading the
+schema on every call.
+"""
+import os
+import queue
+import sqlite3
+import threading
+import unicodedata
+from contextlib import contextmanager
+
+DB_PATH = os.environ.get('PLANTSPEAK_DB', 'plantspeak.db')
+
+# Seconds to wait for a lock held by another connection
+BUSY_TIMEOUT = 5.0
+# Number of idle connections kept open per database file
+POOL_SIZE = 8
+# Prepared statements cached per connection (sqlite3 keys them by SQL text)
+STATEMENT_CACHE_SIZE = 256
+
+
+class ConnectionPool:
+    """A bounded pool of SQLite connections to a single database file"""
+
+    def __init__(self, path, size=POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.path,
+            timeout=BUSY_TIMEOUT,
+            cached_statements=STATEMENT_CACHE_SIZE,
+            # Streamlit runs each rerun on a fresh thread, so connections
+            # are shared between threads (never at the same time)
+            check_same_thread=False,
+            # Autocommit; transactions are opened explicitly by transaction()
+            isolation_level=None,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f'PRAGMA busy_timeout = {int(BUSY_TIMEOUT * 1000)}')
+        if self.path != ':memory:':
+            # WAL lets readers carry on while a writer holds the lock
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')
+        return conn
+
+    def acquire(self):
+        """Take an idle connection from the pool or open a new one"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def release(self, conn):
+        """Return a connection to the pool, closing it if the pool is full"""
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self):
+        """Close all idle connections"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(path=None):
+    """Get the shared connection pool for a database file"""
+    path = path or DB_PATH
+    with _pools_lock:
+        pool = _pools.get(path)
+        if pool is None:
+            pool = _pools[path] = ConnectionPool(path)
+        return pool
+
+
+def close_all():
+    """Close every pooled connection (used on shutdown and in scripts)"""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+@contextmanager
+def connection(path=None):
+    """Borrow a pooled connection for reads or manual transaction control"""
+    pool = get_pool(path)
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+
+@contextmanager
+def transaction(path=None):
+    """Borrow a pooled connection inside a BEGIN IMMEDIATE transaction.
+
+    Commits when the block exits normally and rolls back if it raises.
+    """
+    with connection(path) as conn:
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+
+
+# Schema migrations.
+#
+# Each migration is a function that receives a connection inside an open
+# transaction. Its position in MIGRATIONS is its version number, stored in
+# PRAGMA user_version once applied, so never reorder or remove entries —
+# only append new ones.
+MIGRATIONS = []
+
+
+def migration(func):
+    """Register a schema migration (applied in definition order)"""
+    MIGRATIONS.append(func)
+    return func
+
+
+@migration
+def _create_users_and_submissions(conn):
+    # IF NOT EXISTS so databases created before versioning are adopted as-is
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL,
+        name TEXT,
+        email TEXT UNIQUE,
+        role TEXT,
+        community TEXT,
+        registration_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS submissions (
+        id TEXT PRIMARY KEY,
+        user_id INTEGER,
+        submission_time TIMESTAMP,
+        plant_name TEXT NOT NULL,
+        entry_title TEXT,
+        local_names TEXT,
+        scientific_name TEXT,
+        category TEXT,
+        usage_desc TEXT,
+        prep_method TEXT,
+        community TEXT,
+        tags TEXT,
+        location TEXT,
+        language TEXT,
+        latitude REAL,
+        longitude REAL,
+        photo_path TEXT,
+        voice_path TEXT,
+        notes_path TEXT,
+        age_group TEXT,
+        submitter_role TEXT,
+        submitter_name TEXT,
+        contact_info TEXT,
+        consent TEXT,
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+    ''')
+
+
+
+@migration
+def _index_submission_browsing(conn):
+    # Normalised privacy flag, derived from the free-text consent answer so
+    # the browse query can use an index instead of string comparisons
+    conn.execute('''
+    ALTER TABLE submissions ADD COLUMN is_public INTEGER
+    GENERATED ALWAYS AS (consent IS NOT NULL AND consent != 'No, keep private') VIRTUAL
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_submissions_user_time ON submissions (user_id, submission_time)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_submissions_public_time ON submissions (is_public, submission_time)')
+
+
+@migration
+def _add_id_to_browse_indexes(conn):
+    # Keyset pagination orders by (submission_time, id); with id in the
+    # index, pages are read straight from it without a sort
+    conn.execute('DROP INDEX IF EXISTS idx_submissions_user_time')
+    conn.execute('DROP INDEX IF EXISTS idx_submissions_public_time')
+    conn.execute('CREATE INDEX idx_submissions_user_time ON submissions (user_id, submission_time, id)')
+    conn.execute('CREATE INDEX idx_submissions_public_time ON submissions (is_public, submission_time, id)')
+
+
+# Columns of submissions covered by full-text search
+SEARCH_COLUMNS = [
+    'plant_name', 'entry_title', 'local_names', 'scientific_name', 'usage_desc',
+    'prep_method', 'tags', 'community', 'location',
+]
+
+
+@migration
+def _create_search_index(conn):
+    # unicode61 treats spacing vowel signs (the ी in तुलसी) as separators,
+    # which would split Indic words apart, so declare them word characters
+    spacing_marks = ''.join(
+        chr(c) for c in range(0x0900, 0x0D80) if unicodedata.category(chr(c)) == 'Mc'
+    )
+    columns = ', '.join(SEARCH_COLUMNS)
+    new_values = ', '.join(f'new.{c}' for c in SEARCH_COLUMNS)
+    old_values = ', '.join(f'old.{c}' for c in SEARCH_COLUMNS)
+
+    # External content table: the text lives only in submissions and the
+    # triggers below keep the index in step with it
+    conn.execute(f'''
+    CREATE VIRTUAL TABLE submissions_fts USING fts5(
+        {columns},
+        content='submissions', content_rowid='rowid',
+        tokenize="unicode61 remove_diacritics 2 tokenchars '{spacing_marks}'"
+    )
+    ''')
+    conn.execute(f'''
+    CREATE TRIGGER submissions_fts_insert AFTER INSERT ON submissions BEGIN
+        INSERT INTO submissions_fts (rowid, {columns}) VALUES (new.rowid, {new_values});
+    END
+    ''')
+    conn.execute(f'''
+    CREATE TRIGGER submissions_fts_delete AFTER DELETE ON submissions BEGIN
+        INSERT INTO submissions_fts (submissions_fts, rowid, {columns}) VALUES ('delete', old.rowid, {old_values});
+    END
+    ''')
+    conn.execute(f'''
+    CREATE TRIGGER submissions_fts_update AFTER UPDATE ON submissions BEGIN
+        INSERT INTO submissions_fts (submissions_fts, rowid, {columns}) VALUES ('delete', old.rowid, {old_values});
+        INSERT INTO submissions_fts (rowid, {columns}) VALUES (new.rowid, {new_values});
+    END
+    ''')
+    conn.execute("INSERT INTO submissions_fts (submissions_fts) VALUES ('rebuild')")
+
+
+@migration
+def _create_category_and_tag_tables(conn):
+    # One row per (category, submission) and (tag, submission), keyed so that
+    # "submissions in category X" and per-category counts are index lookups
+    conn.execute('''
+    CREATE TABLE submission_categories (
+        category TEXT NOT NULL,
+        submission_id TEXT NOT NULL,
+        PRIMARY KEY (category, submission_id),
+        FOREIGN KEY (submission_id) REFERENCES submissions (id)
+    ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+    CREATE TABLE submission_tags (
+        tag TEXT NOT NULL,
+        submission_id TEXT NOT NULL,
+        PRIMARY KEY (tag, submission_id),
+        FOREIGN KEY (submission_id) REFERENCES submissions (id)
+    ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX idx_submission_categories_submission ON submission_categories (submission_id)')
+    conn.execute('CREATE INDEX idx_submission_tags_submission ON submission_tags (submission_id)')
+    conn.execute('''
+    CREATE TRIGGER submissions_terms_delete AFTER DELETE ON submissions BEGIN
+        DELETE FROM submission_categories WHERE submission_id = old.id;
+        DELETE FROM submission_tags WHERE submission_id = old.id;
+    END
+    ''')
+
+    # Backfill from the existing comma-separated columns
+    from plantspeak.submissions import save_terms
+    for row in conn.execute('SELECT id, category, tags FROM submissions').fetchall():
+        save_terms(conn, row['id'], row['category'], row['tags'])
+
+
+@migration
+def _create_geocode_cache(conn):
+    # Answers from online geocoders; kind is 'reverse' or 'search' and key
+    # the rounded coordinates or normalised place name
+    conn.execute('''
+    CREATE TABLE geocode_cache (
+        kind TEXT NOT NULL,
+        key TEXT NOT NULL,
+        result TEXT,
+        created_at REAL NOT NULL,
+        last_used REAL NOT NULL,
+        PRIMARY KEY (kind, key)
+    ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX idx_geocode_cache_last_used ON geocode_cache (last_used)')
+
+
+@migration
+def _create_media_table(conn):
+    # Uploaded files, stored once per content hash (see plantspeak.media)
+    conn.execute('''
+    CREATE TABLE media (
+        sha256 TEXT PRIMARY KEY,
+        path TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        mime TEXT,
+        created_at TEXT
+    ) WITHOUT ROWID
+    ''')
+    # The *_path columns are kept for older rows and CSV exports
+    for column in ('photo_sha256', 'voice_sha256', 'notes_sha256'):
+        conn.execute(f'ALTER TABLE submissions ADD COLUMN {column} TEXT REFERENCES media (sha256)')
+
+
+@migration
+def _create_jobs_table(conn):
+    # Background work queued after a submission (see plantspeak.jobs)
+    conn.execute('''
+    CREATE TABLE jobs (
+        id INTEGER PRIMARY KEY,
+        kind TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        submission_id TEXT,
+        status TEXT NOT NULL DEFAULT 'queued',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        run_after REAL NOT NULL,
+        created_at REAL NOT NULL,
+        started_at REAL,
+        finished_at REAL,
+        error TEXT
+    )
+    ''')
+    conn.execute('CREATE INDEX idx_jobs_status ON jobs (status, run_after)')
+    conn.execute('CREATE INDEX idx_jobs_submission ON jobs (submission_id)')
+
+
+@migration
+def _add_audio_metadata(conn):
+    # Filled in for voice recordings by plantspeak.audio; waveform is a
+    # JSON list of peak levels
+    for column, kind in (('duration', 'REAL'), ('bitrate', 'INTEGER'), ('sample_rate', 'INTEGER'),
+                         ('channels', 'INTEGER'), ('waveform', 'TEXT')):
+        conn.execute(f'ALTER TABLE media ADD COLUMN {column} {kind}')
+
+
+@migration
+def _create_spatial_index(conn):
+    # R*Tree over submission coordinates, keyed by submissions rowid.
+    # A latitude/longitude of 0 means "not set" and is left out.
+    conn.execute('''
+    CREATE VIRTUAL TABLE submissions_rtree USING rtree(
+        id, min_lat, max_lat, min_lon, max_lon
+    )
+    ''')
+    located = "new.latitude IS NOT NULL AND new.longitude IS NOT NULL AND (new.latitude != 0 OR new.longitude != 0)"
+    conn.execute(f'''
+    CREATE TRIGGER submissions_rtree_insert AFTER INSERT ON submissions WHEN {located} BEGIN
+        INSERT INTO submissions_rtree VALUES (new.rowid, new.latitude, new.latitude, new.longitude, new.longitude);
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER submissions_rtree_delete AFTER DELETE ON submissions BEGIN
+        DELETE FROM submissions_rtree WHERE id = old.rowid;
+    END
+    ''')
+    conn.execute(f'''
+    CREATE TRIGGER submissions_rtree_update AFTER UPDATE OF latitude, longitude ON submissions BEGIN
+        DELETE FROM submissions_rtree WHERE id = old.rowid;
+        INSERT INTO submissions_rtree
+            SELECT new.rowid, new.latitude, new.latitude, new.longitude, new.longitude WHERE {located};
+    END
+    ''')
+    conn.execute(f'''
+    INSERT INTO submissions_rtree
+        SELECT rowid, latitude, latitude, longitude, longitude FROM submissions AS new WHERE {located}
+    ''')
+
+
+@migration
+def _create_map_clusters(conn):
+    # Public submissions counted per grid cell at each map zoom level, so the
+    # browse map draws one marker per cell instead of every point. A cell at
+    # zoom z is 360 / 2^(z + 2) degrees square, about a quarter of a map tile.
+    conn.execute('CREATE TABLE map_cluster_levels (zoom INTEGER PRIMARY KEY, cell_size REAL NOT NULL)')
+    conn.executemany(
+        'INSERT INTO map_cluster_levels (zoom, cell_size) VALUES (?, ?)',
+        [(zoom, 360 / 2 ** (zoom + 2)) for zoom in range(13)]
+    )
+    # sum_lat and sum_lon give each cell's marker the mean position of its points
+    conn.execute('''
+    CREATE TABLE map_clusters (
+        zoom INTEGER NOT NULL,
+        cell_lat INTEGER NOT NULL,
+        cell_lon INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        sum_lat REAL NOT NULL,
+        sum_lon REAL NOT NULL,
+        PRIMARY KEY (zoom, cell_lat, cell_lon)
+    ) WITHOUT ROWID
+    ''')
+
+    def cells(row):
+        return (f'SELECT zoom, CAST(({row}.latitude + 90) / cell_size AS INTEGER), '
+                f'CAST(({row}.longitude + 180) / cell_size AS INTEGER) FROM map_cluster_levels')
+
+    def counted(row):
+        return (f'{row}.is_public AND {row}.latitude IS NOT NULL AND {row}.longitude IS NOT NULL '
+                f'AND ({row}.latitude != 0 OR {row}.longitude != 0)')
+
+    add = f'''
+        INSERT INTO map_clusters (zoom, cell_lat, cell_lon, count, sum_lat, sum_lon)
+            SELECT cell.*, 1, new.latitude, new.longitude FROM ({cells('new')}) AS cell WHERE {counted('new')}
+            ON CONFLICT (zoom, cell_lat, cell_lon) DO UPDATE SET
+                count = count + 1, sum_lat = sum_lat + excluded.sum_lat, sum_lon = sum_lon + excluded.sum_lon;
+    '''
+    remove = f'''
+        UPDATE map_clusters SET count = count - 1, sum_lat = sum_lat - old.latitude, sum_lon = sum_lon - old.longitude
+            WHERE {counted('old')} AND (zoom, cell_lat, cell_lon) IN ({cells('old')});
+        DELETE FROM map_clusters WHERE count <= 0 AND (zoom, cell_lat, cell_lon) IN ({cells('old')});
+    '''
+    conn.execute(f'CREATE TRIGGER map_clusters_insert AFTER INSERT ON submissions BEGIN {add} END')
+    conn.execute(f'CREATE TRIGGER map_clusters_delete AFTER DELETE ON submissions BEGIN {remove} END')
+    conn.execute(f'''
+    CREATE TRIGGER map_clusters_update AFTER UPDATE OF latitude, longitude, consent ON submissions BEGIN
+        {remove}
+        {add}
+    END
+    ''')
+    conn.execute(f'''
+    INSERT INTO map_clusters (zoom, cell_lat, cell_lon, count, sum_lat, sum_lon)
+        SELECT level.zoom,
+               CAST((new.latitude + 90) / level.cell_size AS INTEGER),
+               CAST((new.longitude + 180) / level.cell_size AS INTEGER),
+               COUNT(*), SUM(new.latitude), SUM(new.longitude)
+        FROM submissions AS new CROSS JOIN map_cluster_levels AS level
+        WHERE {counted('new')}
+        GROUP BY 1, 2, 3
+    ''')
+
+
+@migration
+def _add_media_stored_at(conn):
+    # When a file was last handed out by plantspeak.media.store(), so that
+    # unused files are only pruned once no upload can still be saving them
+    conn.execute('ALTER TABLE media ADD COLUMN stored_at TEXT')
+    conn.execute('UPDATE media SET stored_at = created_at')
+
+
+
+@migration
+def _fill_missing_submission_times(conn):
+    # Keyset pagination compares (submission_time, id), which is NULL for a
+    # NULL time, so such rows could never be paged to. Older CSV imports
+    # left missing times NULL; they become '' and sort as the oldest.
+    conn.execute("UPDATE submissions SET submission_time = '' WHERE submission_time IS NULL")
+    # Rows replayed from older journal snapshots may still have none
+    conn.execute('''
+    CREATE TRIGGER submissions_time_insert AFTER INSERT ON submissions WHEN new.submission_time IS NULL BEGIN
+        UPDATE submissions SET submission_time = '' WHERE rowid = new.rowid;
+    END
+    ''')
+
+
+def schema_version(conn):
+    """Return the migration version a database is currently at"""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(path=None):
+    """Apply any pending migrations and return the resulting schema version.
+
+    An up-to-date database is detected with a plain read, so this takes no
+    write lock unless there is actually something to apply.
+    """
+    target = len(MIGRATIONS)
+    with connection(path) as conn:
+        current = schema_version(conn)
+        if current >= target:
+            return current
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Another process may have migrated while we waited for the lock
+            current = schema_version(conn)
+            for version in range(current + 1, target + 1):
+                MIGRATIONS[version - 1](conn)
+                conn.execute(f'PRAGMA user_version = {version}')
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        return schema_version(conn)
@@ -0,0 +1,123 @@
+"""Export of submissions as CSV, JSON Lines or Parquet.
+
+Rows are streamed from the database in chunks with the same keyset
+pagination used by the browse tab and written straight to a file object,
+so an export never holds more than one chunk of rows in memory. Parquet
+needs the optional pyarrow package and is only offered when it is installed.
+
+Usage:
+    python -m plantspeak.export snapshot.parquet [--format Parquet]
+"""
+import argparse
+import csv
+import importlib.util
+import io
+import json
+import os
+
+from plantspeak import db, submissions
+
+EXPORT_CHUNK_SIZE = 1000
+
+# Columns included in exports; contact details are never exported
+EXPORT_COLUMNS = [
+    'id', 'plant_name', 'entry_title', 'scientific_name', 'category', 'local_names',
+    'usage_desc', 'prep_method', 'community', 'tags', 'location', 'language',
+    'latitude', 'longitude', 'submission_time',
+]
+
+# Format name -> (file extension, MIME type)
+FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'JSON Lines': ('jsonl', 'application/x-ndjson'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+
+def available_formats():
+    """Export formats that can be produced with the installed packages"""
+    formats = ['CSV', 'JSON Lines']
+    if importlib.util.find_spec('pyarrow') is not None:
+        formats.append('Parquet')
+    return formats
+
+
+def iter_chunks(query, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the rows matched by query as lists of EXPORT_COLUMNS dicts"""
+    cursor = None
+    while True:
+        rows, cursor = submissions.fetch_page(query, cursor, chunk_size)
+        if rows:
+            yield [{column: row.get(column) for column in EXPORT_COLUMNS} for row in rows]
+        if cursor is None:
+            break
+
+
+def write_csv(query, f):
+    """Write the rows matched by query to binary file f as CSV"""
+    text = io.TextIOWrapper(f, encoding='utf-8', newline='', write_through=True)
+    writer = csv.DictWriter(text, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for chunk in iter_chunks(query):
+        writer.writerows(chunk)
+    # Hand f back to the caller still open
+    text.detach()
+
+
+def write_jsonl(query, f):
+    """Write the rows matched by query to binary file f as JSON Lines"""
+    for chunk in iter_chunks(query):
+        f.write(''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in chunk).encode('utf-8'))
+
+
+def write_parquet(query, f):
+    """Write the rows matched by query to binary file f as Parquet, one row group per chunk"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        (column, pa.float64() if column in ('latitude', 'longitude') else pa.string())
+        for column in EXPORT_COLUMNS
+    ])
+    with pq.ParquetWriter(f, schema) as writer:
+        for chunk in iter_chunks(query):
+            for row in chunk:
+                row['submission_time'] = str(row['submission_time']) if row['submission_time'] else None
+            writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+
+
+_WRITERS = {
+    'CSV': write_csv,
+    'JSON Lines': write_jsonl,
+    'Parquet': write_parquet,
+}
+
+
+def export(query, fmt, f):
+    """Write the rows matched by query to binary file f in the given format"""
+    _WRITERS[fmt](query, f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export public PlantSpeak submissions")
+    parser.add_argument('output', help="file to write")
+    parser.add_argument('--format', choices=list(FORMATS), help="default: from the output file extension")
+    parser.add_argument('--db', default=db.DB_PATH, help="SQLite database (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    fmt = args.format
+    if fmt is None:
+        extension = os.path.splitext(args.output)[1].lstrip('.').lower()
+        fmt = next((name for name, (ext, _) in FORMATS.items() if ext == extension), 'CSV')
+    if fmt not in available_formats():
+        parser.error(f"{fmt} export needs the pyarrow package")
+
+    db.DB_PATH = args.db
+    # Snapshots only ever contain public submissions
+    with open(args.output, 'wb') as f:
+        export(submissions.SubmissionQuery(), fmt, f)
+    db.close_all()
+
+
+if __name__ == '__main__':
+    main()
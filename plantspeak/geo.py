@@ -0,0 +1,545 @@
+"""Geocoding for the Add Entry tab.
+
+Lookups are answered from a gazetteer of Indian places bundled with the
+app, so they work without network access and without rate limits. Nearest
+place lookups use a k-d tree over the places' positions on the unit sphere;
+name searches use a prefix index backed by trigram similarity for typos
+and alternative spellings. OpenStreetMap's Nominatim service can be chained
+after the gazetteer as a fallback for places it does not know; its answers
+are cached on disk and requests to it are throttled to its usage policy.
+
+Lookups that may go over the network are run on a small thread pool with
+start_lookup(), so the Streamlit script can keep rendering while they are
+in flight and pick the answer up on a later rerun.
+
+The backends tried, in order, are set with PLANTSPEAK_GEOCODER, e.g.
+"offline,nominatim" (the default), "offline" or "nominatim". A larger
+gazetteer with the same columns (name, state, kind, latitude, longitude and
+optionally district) can be used by pointing PLANTSPEAK_GAZETTEER at it.
+"""
+import bisect
+import csv
+import json
+import math
+import os
+import threading
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from plantspeak import db, http_client
+
+GAZETTEER_PATH = os.environ.get(
+    'PLANTSPEAK_GAZETTEER', os.path.join(os.path.dirname(__file__), 'data', 'gazetteer_in.csv')
+)
+BACKENDS = [b.strip() for b in os.environ.get('PLANTSPEAK_GEOCODER', 'offline,nominatim').split(',') if b.strip()]
+
+EARTH_RADIUS_KM = 6371.0
+# Reverse lookups further than this from any known place are left unanswered
+MAX_REVERSE_DISTANCE_KM = 50
+# Minimum trigram similarity for a fuzzy name match
+MIN_SIMILARITY = 0.3
+
+NOMINATIM_URL = "https://nominatim.openstreetmap.org"
+NOMINATIM_TIMEOUT = 10
+# Requests per second allowed to Nominatim
+NOMINATIM_RATE = 1.0
+# Seconds a lookup may wait for its turn before giving up
+THROTTLE_TIMEOUT = 5
+
+# Nominatim answers are cached in the geocode_cache table.
+# Decimal places kept when rounding coordinates for reverse lookups
+# (3 places is roughly 100 m)
+CACHE_PRECISION = int(os.environ.get('PLANTSPEAK_GEOCODE_PRECISION', 3))
+CACHE_TTL = 30 * 24 * 3600
+# "Not found" answers are kept for less time
+CACHE_NEGATIVE_TTL = 24 * 3600
+CACHE_MAX_ENTRIES = 20000
+
+# Approximate location from the user's IP address
+IP_LOCATION_URL = "https://ipapi.co/json/"
+IP_LOCATION_TIMEOUT = 10
+
+# Seconds a background lookup may take before its answer is abandoned
+LOOKUP_DEADLINE = 15
+LOOKUP_WORKERS = 4
+# Seconds between reruns of the app while a lookup is pending
+LOOKUP_POLL_INTERVAL = 0.5
+
+# Preferred kinds of place when several names match equally well
+_KIND_RANK = {'state': 0, 'capital': 1, 'district': 2, 'town': 3, 'village': 4}
+
+
+def _unit_vector(lat, lon):
+    """Position on the unit sphere; straight-line distance between these
+    grows with great-circle distance, so nearest neighbours agree"""
+    lat, lon = math.radians(lat), math.radians(lon)
+    return (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat))
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points in kilometres"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def normalise_name(name):
+    """Lower-case, accent-free, single-spaced form of a place name"""
+    # Decompose so Latin accents can be dropped; marks in Indic scripts
+    # (vowel signs, viramas) are part of the word and are kept
+    chars = []
+    for ch in unicodedata.normalize('NFKD', name.casefold()):
+        category = unicodedata.category(ch)
+        if category.startswith('M') and ord(ch) < 0x0900:
+            continue
+        chars.append(ch if category[0] in 'LNM' else ' ')
+    return ' '.join(''.join(chars).split())
+
+
+def _trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class KDTree:
+    """A static 3-d tree for nearest-neighbour queries"""
+
+    def __init__(self, points):
+        # Nodes are (index, axis, left, right)
+        self.points = points
+        self.root = self._build(list(range(len(points))), 0)
+
+    def _build(self, indices, depth):
+        if not indices:
+            return None
+        axis = depth % 3
+        indices.sort(key=lambda i: self.points[i][axis])
+        middle = len(indices) // 2
+        return (
+            indices[middle], axis,
+            self._build(indices[:middle], depth + 1),
+            self._build(indices[middle + 1:], depth + 1),
+        )
+
+    def nearest(self, target):
+        """Return (index, squared distance) of the point closest to target"""
+        best = [None, float('inf')]
+
+        def visit(node):
+            if node is None:
+                return
+            index, axis, left, right = node
+            point = self.points[index]
+            distance = sum((p - t) ** 2 for p, t in zip(point, target))
+            if distance < best[1]:
+                best[0], best[1] = index, distance
+            diff = target[axis] - point[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            visit(near)
+            # Only cross the splitting plane if it is closer than the best so far
+            if diff * diff < best[1]:
+                visit(far)
+
+        visit(self.root)
+        return best[0], best[1]
+
+
+class Gazetteer:
+    """Places loaded from a gazetteer CSV, indexed by position and by name"""
+
+    def __init__(self, path):
+        self.places = []
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                self.places.append({
+                    'name': row['name'],
+                    'district': row.get('district') or '',
+                    'state': row['state'],
+                    'kind': row['kind'],
+                    'lat': float(row['latitude']),
+                    'lon': float(row['longitude']),
+                })
+
+        # States are regions, not places you can be near, so reverse
+        # lookups only consider the rest
+        self._located = [i for i, p in enumerate(self.places) if p['kind'] != 'state']
+        self._tree = KDTree([_unit_vector(self.places[i]['lat'], self.places[i]['lon']) for i in self._located])
+
+        self._names = sorted((normalise_name(p['name']), i) for i, p in enumerate(self.places))
+        self._by_trigram = defaultdict(list)
+        for name, i in self._names:
+            for gram in _trigrams(name):
+                self._by_trigram[gram].append(i)
+
+    def display_name(self, place):
+        parts = [place['name']]
+        if place['district'] and place['district'] != place['name']:
+            parts.append(place['district'])
+        if place['state'] != place['name']:
+            parts.append(place['state'])
+        parts.append('India')
+        return ', '.join(parts)
+
+    def nearest(self, lat, lon):
+        """Return (place, distance in km) for the place closest to a point"""
+        if not self._located:
+            return None, None
+        index, _ = self._tree.nearest(_unit_vector(lat, lon))
+        place = self.places[self._located[index]]
+        return place, haversine_km(lat, lon, place['lat'], place['lon'])
+
+    def search(self, text, limit=5, exact=False):
+        """
+        Find places by name. "Guntur, Andhra Pradesh" style queries narrow
+        the match down by state or district. Unless exact is set, names
+        starting with the query or spelled like it also match. Returns up
+        to limit places, best match first.
+        """
+        name, _, qualifier = text.partition(',')
+        name = normalise_name(name)
+        qualifier = normalise_name(qualifier)
+        if not name:
+            return []
+
+        def qualifies(place):
+            return not qualifier or qualifier in (normalise_name(place['state']), normalise_name(place['district']))
+
+        # Names starting with the query: exact matches first, then shortest
+        prefixed = []
+        for position in range(bisect.bisect_left(self._names, (name, -1)), len(self._names)):
+            candidate, i = self._names[position]
+            if not candidate.startswith(name):
+                break
+            if qualifies(self.places[i]):
+                prefixed.append((candidate != name, len(candidate), _KIND_RANK.get(self.places[i]['kind'], 5), i))
+        if exact:
+            prefixed = [match for match in prefixed if not match[0]]
+        if prefixed or exact:
+            return [self.places[i] for *_, i in sorted(prefixed)[:limit]]
+
+        # Otherwise rank by shared trigrams (Jaccard similarity)
+        query_grams = _trigrams(name)
+        shared = Counter(i for gram in query_grams for i in self._by_trigram.get(gram, ()))
+        scored = []
+        for i, common in shared.items():
+            place_grams = len(_trigrams(normalise_name(self.places[i]['name'])))
+            similarity = common / (len(query_grams) + place_grams - common)
+            if similarity >= MIN_SIMILARITY and qualifies(self.places[i]):
+                scored.append((-similarity, _KIND_RANK.get(self.places[i]['kind'], 5), i))
+        return [self.places[i] for *_, i in sorted(scored)[:limit]]
+
+
+_gazetteer = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer():
+    """Load the gazetteer once per process"""
+    global _gazetteer
+    with _gazetteer_lock:
+        if _gazetteer is None:
+            _gazetteer = Gazetteer(GAZETTEER_PATH)
+        return _gazetteer
+
+
+# Backends. Each returns None when it has no answer, so the next one is tried.
+
+def offline_reverse(lat, lon):
+    gazetteer = get_gazetteer()
+    place, distance = gazetteer.nearest(lat, lon)
+    if place is None or distance > MAX_REVERSE_DISTANCE_KM:
+        return None
+    return gazetteer.display_name(place)
+
+
+def offline_search(location_name, exact=False):
+    matches = get_gazetteer().search(location_name, limit=1, exact=exact)
+    if not matches:
+        return None
+    return matches[0]['lat'], matches[0]['lon']
+
+
+class TokenBucket:
+    """Allow at most rate calls per second on average, in bursts of up to capacity"""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout):
+        """Wait for a token; return False if none is available within timeout seconds"""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+# Nominatim's usage policy allows at most one request per second
+_nominatim_bucket = TokenBucket(rate=NOMINATIM_RATE)
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+# Lookups currently being fetched: key -> (done event, [result])
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def cache_stats():
+    """Geocoding cache counters for the debug panel"""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats.get('hits', 0) + stats.get('misses', 0)
+    stats['hit_rate'] = stats.get('hits', 0) / lookups if lookups else 0.0
+    return stats
+
+
+def reverse_key(lat, lon):
+    """Cache key for a point, rounded so nearby points share an entry"""
+    return f"{round(lat, CACHE_PRECISION):.{CACHE_PRECISION}f},{round(lon, CACHE_PRECISION):.{CACHE_PRECISION}f}"
+
+
+def _read_cache(kind, key):
+    """Return (found, result) for a cached lookup that has not expired"""
+    now = time.time()
+    with db.connection() as conn:
+        row = conn.execute(
+            'SELECT result, created_at, last_used FROM geocode_cache WHERE kind = ? AND key = ?', (kind, key)
+        ).fetchone()
+    if row is None:
+        return False, None
+    result = json.loads(row['result'])
+    ttl = CACHE_TTL if result is not None else CACHE_NEGATIVE_TTL
+    if row['created_at'] + ttl < now:
+        return False, None
+    # Refreshing the LRU timestamp is a write, so only do it occasionally
+    if row['last_used'] + 3600 < now:
+        with db.transaction() as conn:
+            conn.execute(
+                'UPDATE geocode_cache SET last_used = ? WHERE kind = ? AND key = ?', (now, kind, key)
+            )
+    return True, result
+
+
+def _write_cache(kind, key, result):
+    now = time.time()
+    with db.transaction() as conn:
+        conn.execute(
+            'INSERT OR REPLACE INTO geocode_cache (kind, key, result, created_at, last_used) VALUES (?, ?, ?, ?, ?)',
+            (kind, key, json.dumps(result), now, now)
+        )
+        # Evict the least recently used entries once the cache is full
+        conn.execute('''
+            DELETE FROM geocode_cache WHERE (kind, key) IN (
+                SELECT kind, key FROM geocode_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )
+        ''', (CACHE_MAX_ENTRIES,))
+
+
+def _cached_lookup(kind, key, fetch):
+    """
+    Serve a network lookup from the on-disk cache, or fetch it once.
+    Sessions asking for the same key at the same time share one request.
+    Returns None if the lookup could not be made in time.
+    """
+    found, result = _read_cache(kind, key)
+    if found:
+        _count('hits')
+        return result
+    _count('misses')
+
+    with _inflight_lock:
+        waiting = _inflight.get((kind, key))
+        if waiting is None:
+            _inflight[(kind, key)] = (threading.Event(), [None])
+    if waiting is not None:
+        _count('coalesced')
+        done, holder = waiting
+        done.wait(NOMINATIM_TIMEOUT + THROTTLE_TIMEOUT)
+        return holder[0]
+
+    done, holder = _inflight[(kind, key)]
+    try:
+        if not _nominatim_bucket.acquire(THROTTLE_TIMEOUT):
+            _count('throttled')
+            return None
+        holder[0] = fetch()
+        _write_cache(kind, key, holder[0])
+        return holder[0]
+    finally:
+        with _inflight_lock:
+            del _inflight[(kind, key)]
+        done.set()
+
+
+def _fetch_reverse(lat, lon):
+    response = http_client.get(
+        f"{NOMINATIM_URL}/reverse",
+        endpoint='nominatim/reverse',
+        # Paced by _nominatim_bucket, which retries would bypass
+        rate_limited=True,
+        params={"lat": lat, "lon": lon, "format": "json"},
+        timeout=NOMINATIM_TIMEOUT,
+    )
+    # Errors are raised rather than returned so they are not cached
+    response.raise_for_status()
+    return response.json().get("display_name")
+
+
+def _fetch_search(location_name):
+    response = http_client.get(
+        f"{NOMINATIM_URL}/search",
+        endpoint='nominatim/search',
+        # Paced by _nominatim_bucket, which retries would bypass
+        rate_limited=True,
+        params={"q": location_name, "format": "json"},
+        timeout=NOMINATIM_TIMEOUT,
+    )
+    response.raise_for_status()
+    data = response.json()
+    if data:
+        return [float(data[0]["lat"]), float(data[0]["lon"])]
+    return None
+
+
+def nominatim_reverse(lat, lon):
+    # Look up the rounded point, so the answer is the same for every
+    # point that shares its cache entry
+    key = reverse_key(lat, lon)
+    rounded_lat, rounded_lon = map(float, key.split(','))
+    return _cached_lookup('reverse', key, lambda: _fetch_reverse(rounded_lat, rounded_lon))
+
+
+def nominatim_search(location_name):
+    key = normalise_name(location_name)
+    if not key:
+        return None
+    result = _cached_lookup('search', key, lambda: _fetch_search(location_name))
+    return tuple(result) if result else None
+
+
+_REVERSE = {'offline': offline_reverse, 'nominatim': nominatim_reverse}
+_SEARCH = {'offline': offline_search, 'nominatim': nominatim_search}
+
+
+def reverse_geocode(lat, lon, backends=None):
+    """Describe the place at a point, or None if no backend knows it"""
+    for backend in backends or BACKENDS:
+        result = _REVERSE[backend](lat, lon)
+        if result:
+            return result
+    return None
+
+
+def forward_geocode(location_name, backends=None):
+    """
+    Find (lat, lon) for a place name, or (None, None) if no backend knows it.
+    While another backend follows, the gazetteer only answers for exact
+    names, so "Sri" is not taken for Srinagar without asking Nominatim; its
+    closest name is the last resort, also when Nominatim cannot be reached.
+    """
+    backends = backends or BACKENDS
+    failure = None
+    for position, backend in enumerate(backends):
+        if backend == 'offline':
+            result = offline_search(location_name, exact=position < len(backends) - 1)
+        else:
+            try:
+                result = _SEARCH[backend](location_name)
+            except requests.RequestException as e:
+                failure = e
+                continue
+        if result:
+            return result
+    if 'offline' in backends[:-1]:
+        result = offline_search(location_name)
+        if result:
+            return result
+    if failure is not None:
+        raise failure
+    return None, None
+
+
+def ip_locate():
+    """Approximate (lat, lon) of the user's network, or (None, None)"""
+    response = http_client.get(IP_LOCATION_URL, endpoint='ipapi', timeout=IP_LOCATION_TIMEOUT)
+    response.raise_for_status()
+    data = response.json()
+    if data.get("latitude") is None or data.get("longitude") is None:
+        return None, None
+    return float(data["latitude"]), float(data["longitude"])
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=LOOKUP_WORKERS, thread_name_prefix='geocode')
+        return _executor
+
+
+class Lookup:
+    """A geocoding call running in the background, polled on each rerun"""
+
+    def __init__(self, fn, *args, deadline=LOOKUP_DEADLINE):
+        self.args = args
+        self.deadline = time.monotonic() + deadline
+        self.future = _get_executor().submit(fn, *args)
+        self.timed_out = False
+
+    def status(self):
+        """'pending', 'done', 'failed' or 'timed_out'"""
+        # Once timed out, a lookup stays timed out; a cancelled future would
+        # raise CancelledError from exception()
+        if self.timed_out:
+            return 'timed_out'
+        if self.future.done():
+            return 'failed' if self.future.exception() is not None else 'done'
+        if time.monotonic() > self.deadline:
+            # A call that has already started cannot be interrupted, but it
+            # is bounded by its own request timeout; its answer is discarded
+            self.future.cancel()
+            self.timed_out = True
+            return 'timed_out'
+        return 'pending'
+
+    def result(self):
+        """The lookup's return value; only call once status() is 'done'"""
+        return self.future.result()
+
+    def error(self):
+        """The exception raised by a failed lookup"""
+        if self.future.cancelled():
+            return None
+        return self.future.exception()
+
+
+def start_lookup(fn, *args, deadline=LOOKUP_DEADLINE):
+    """Run fn(*args) in the background and return a Lookup to poll"""
+    return Lookup(fn, *args, deadline=deadline)
@@ -0,0 +1,203 @@
+"""Shared HTTP client for calls to web services.
+
+Every outbound request goes through one requests.Session, so connections
+to a host are kept alive and reused rather than paying for a new TCP and
+TLS handshake per lookup. Failed requests are retried with exponential
+backoff, except that calls to rate-limited services (rate_limited=True)
+only retry connections that failed before reaching the server, since a
+resent request would not be paced by the caller's rate limit. Each endpoint has a circuit breaker: after repeated failures its
+calls fail immediately for a while instead of each waiting for a timeout.
+Latencies are recorded per endpoint for the debug panel.
+"""
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+USER_AGENT = "PlantSpeakApp/1.0"
+# Connections kept open per host
+POOL_SIZE = 10
+# Retries of failed requests, waiting BACKOFF_FACTOR * 2 ** n seconds between them
+RETRIES = 3
+BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Consecutive failures that open an endpoint's circuit
+FAILURE_THRESHOLD = 5
+# Seconds an open circuit waits before letting a trial request through
+RESET_TIMEOUT = 60
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of making a request to an endpoint that keeps failing"""
+
+
+class CircuitBreaker:
+    """Stop calling an endpoint after FAILURE_THRESHOLD consecutive failures"""
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        """'closed', 'open' or 'half-open' (the next request is a trial)"""
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def before_request(self, endpoint):
+        with self._lock:
+            if self.state == 'open':
+                raise CircuitOpenError(f"{endpoint} is unavailable, not retrying for a while")
+            if self.state == 'half-open':
+                # Let one trial request through; keep others out until it answers
+                self.opened_at = time.monotonic()
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class LatencyHistogram:
+    """Counts of request durations in LATENCY_BUCKETS"""
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.total = 0.0
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds, error=False):
+        with self._lock:
+            self.counts[next(i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound)] += 1
+            self.total += seconds
+            self.requests += 1
+            self.errors += error
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of requests"""
+        target = fraction * self.requests
+        seen = 0
+        for bound, n in zip(LATENCY_BUCKETS, self.counts):
+            seen += n
+            if n and seen >= target:
+                return bound
+        return None
+
+    def summary(self):
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'mean': self.total / self.requests if self.requests else None,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'buckets': dict(zip(LATENCY_BUCKETS, self.counts)),
+        }
+
+
+# Sessions by rate_limited flag
+_sessions = {}
+_session_lock = threading.Lock()
+_breakers = {}
+_histograms = {}
+_endpoints_lock = threading.Lock()
+
+
+def get_session(rate_limited=False):
+    """The process-wide session, created on first use"""
+    with _session_lock:
+        if rate_limited not in _sessions:
+            if rate_limited:
+                # Only connections that were never made are retried
+                retry = Retry(total=RETRIES, read=0, status=0, backoff_factor=BACKOFF_FACTOR,
+                              raise_on_status=False)
+            else:
+                retry = Retry(
+                    total=RETRIES,
+                    backoff_factor=BACKOFF_FACTOR,
+                    status_forcelist=RETRY_STATUSES,
+                    allowed_methods=frozenset(['GET']),
+                    respect_retry_after_header=True,
+                    # Hand the last response back instead of raising, so callers
+                    # see the real status code
+                    raise_on_status=False,
+                )
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers['User-Agent'] = USER_AGENT
+            _sessions[rate_limited] = session
+        return _sessions[rate_limited]
+
+
+def _endpoint(name):
+    with _endpoints_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker()
+            _histograms[name] = LatencyHistogram()
+        return _breakers[name], _histograms[name]
+
+
+def get(url, endpoint=None, rate_limited=False, **kwargs):
+    """
+    GET url through the shared session; kwargs are passed to requests.
+    endpoint names the circuit breaker and histogram the call belongs to,
+    by default the URL's host and path. Set rate_limited for services whose
+    calls the caller paces, so error responses are returned rather than
+    resent. Raises requests.RequestException
+    (CircuitOpenError if the endpoint's circuit is open) or returns the
+    response, which may still have an error status.
+    """
+    if endpoint is None:
+        parts = urlsplit(url)
+        endpoint = parts.netloc + parts.path
+    breaker, histogram = _endpoint(endpoint)
+    breaker.before_request(endpoint)
+
+    started = time.monotonic()
+    try:
+        response = get_session(rate_limited).get(url, **kwargs)
+    except requests.RequestException:
+        histogram.record(time.monotonic() - started, error=True)
+        breaker.record_failure()
+        raise
+
+    # Server errors count against the endpoint; client errors are the caller's
+    failed = response.status_code >= 500 or response.status_code == 429
+    histogram.record(time.monotonic() - started, error=failed)
+    if failed:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return response
+
+
+def stats():
+    """Per-endpoint latency summary and circuit state, for the debug panel"""
+    with _endpoints_lock:
+        names = list(_breakers)
+    return {
+        name: {**_histograms[name].summary(), 'circuit': _breakers[name].state}
+        for name in names
+    }
@@ -0,0 +1,135 @@
+"""Translations of the interface text.
+
+Each language has a catalogue in data/locales/<code>.json with its name
+(in that language), its messages and a fallback chain of other locales
+for messages it does not have yet; English is always the last resort.
+The catalogues are read once per process, with the fallbacks already
+merged in, so a lookup is a single dict access and every session shares
+the same dicts.
+
+Messages looked up but missing from a language are counted, for the debug
+panel. To check that every language has every English message:
+    python -m plantspeak.i18n
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+from collections import Counter
+
+LOCALE_DIR = os.path.join(os.path.dirname(__file__), 'data', 'locales')
+# Locales offered in the language pickers, in this order
+LOCALES = ['en', 'hi', 'te', 'ta', 'kn', 'mr', 'ml']
+DEFAULT_LOCALE = 'en'
+
+
+class Catalogue:
+    """The messages of one language, with its fallbacks merged in"""
+
+    def __init__(self, code, name, messages, own_keys):
+        self.code = code
+        self.name = name
+        self.messages = messages
+        # Keys translated in this language itself rather than a fallback
+        self.own_keys = own_keys
+
+
+def _read(code, locale_dir):
+    with open(os.path.join(locale_dir, f'{code}.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _fallback_chain(code, raw):
+    """The locales whose messages fill the gaps in code's, nearest first"""
+    chain = []
+    pending = list(raw[code].get('fallback', []))
+    while pending:
+        fallback = pending.pop(0)
+        if fallback != code and fallback not in chain and fallback in raw:
+            chain.append(fallback)
+            pending.extend(raw[fallback].get('fallback', []))
+    if code != DEFAULT_LOCALE and DEFAULT_LOCALE not in chain:
+        chain.append(DEFAULT_LOCALE)
+    return chain
+
+
+def load_catalogues(locale_dir=LOCALE_DIR, locales=LOCALES):
+    """Read the catalogues and return {language name: Catalogue}"""
+    raw = {code: _read(code, locale_dir) for code in locales}
+    catalogues = {}
+    for code in locales:
+        messages = {}
+        for source in reversed([code, *_fallback_chain(code, raw)]):
+            messages.update(raw[source]['messages'])
+        catalogue = Catalogue(code, raw[code]['name'], messages, frozenset(raw[code]['messages']))
+        catalogues[catalogue.name] = catalogue
+    return catalogues
+
+
+CATALOGUES = load_catalogues()
+# Language names offered in the language pickers
+LANGUAGE_OPTIONS = list(CATALOGUES)
+_default = next(c for c in CATALOGUES.values() if c.code == DEFAULT_LOCALE)
+
+_missing = Counter()
+_missing_lock = threading.Lock()
+
+
+def get_text(key, lang='English'):
+    """Get translated text based on selected language"""
+    catalogue = CATALOGUES.get(lang, _default)
+    if key not in catalogue.own_keys:
+        with _missing_lock:
+            _missing[(catalogue.name, key)] += 1
+    return catalogue.messages.get(key, key)
+
+
+def missing_report():
+    """{language name: {key: lookups}} of messages shown from a fallback, or as their key"""
+    report = {}
+    with _missing_lock:
+        for (lang, key), count in _missing.items():
+            report.setdefault(lang, {})[key] = count
+    return report
+
+
+def verify(catalogues=None):
+    """
+    Compare every catalogue with the English one. Returns {language name:
+    {'missing': keys without a translation, 'extra': keys English lacks}}
+    for the languages with differences.
+    """
+    catalogues = catalogues or CATALOGUES
+    reference = next(c for c in catalogues.values() if c.code == DEFAULT_LOCALE).own_keys
+    problems = {}
+    for catalogue in catalogues.values():
+        missing = sorted(reference - catalogue.own_keys)
+        extra = sorted(catalogue.own_keys - reference)
+        if missing or extra:
+            problems[catalogue.name] = {'missing': missing, 'extra': extra}
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that every PlantSpeak language has every message")
+    parser.add_argument('--locales', default=LOCALE_DIR, help="catalogue directory (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    catalogues = load_catalogues(args.locales)
+    problems = verify(catalogues)
+    for catalogue in catalogues.values():
+        found = problems.get(catalogue.name)
+        if found is None:
+            print(f"{catalogue.code} ({catalogue.name}): {len(catalogue.own_keys)} messages, complete")
+            continue
+        print(f"{catalogue.code} ({catalogue.name}): {len(found['missing'])} missing, {len(found['extra'])} not in English")
+        for key in found['missing']:
+            print(f"  missing: {key}")
+        for key in found['extra']:
+            print(f"  not in English: {key}")
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,225 @@
+"""Bulk import of legacy CSV exports into the submissions table.
+
+The CSV is streamed in chunks; each chunk is validated and written in a
+single transaction with executemany, so a large import holds the write
+lock briefly and repeatedly rather than once per row. Rows whose ID is
+already in the database are skipped, which makes re-running an import safe.
+Imported rows are also appended to the database's journal once each
+chunk has committed.
+
+Usage:
+    python -m plantspeak.importer plantspeak_submissions.csv [--db plantspeak.db]
+"""
+import argparse
+import csv
+import math
+import os
+import uuid
+from datetime import datetime
+
+from plantspeak import db, journal, submissions
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# CSV header -> submissions column
+CSV_COLUMNS = {
+    'ID': 'id',
+    'Time': 'submission_time',
+    'Plant Name': 'plant_name',
+    'Entry Title': 'entry_title',
+    'Local Names': 'local_names',
+    'Scientific Name': 'scientific_name',
+    'Category': 'category',
+    'Usage Description': 'usage_desc',
+    'Preparation Method': 'prep_method',
+    'Community': 'community',
+    'Tags': 'tags',
+    'Location': 'location',
+    'Language': 'language',
+    'Latitude': 'latitude',
+    'Longitude': 'longitude',
+    'Age Group': 'age_group',
+    'Role': 'submitter_role',
+    'Name': 'submitter_name',
+    'Contact': 'contact_info',
+    'Consent': 'consent',
+    'Photo Path': 'photo_path',
+    'Voice Path': 'voice_path',
+    'Notes Path': 'notes_path',
+    'User ID': 'user_id',
+}
+
+_INSERT_COLUMNS = list(CSV_COLUMNS.values())
+_INSERT = (
+    f"INSERT OR IGNORE INTO submissions ({', '.join(_INSERT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in _INSERT_COLUMNS)})"
+)
+
+
+class ImportResult:
+    """Running totals for an import, passed to the progress callback"""
+
+    def __init__(self):
+        self.read = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.rejected = 0
+        # Fraction of the file read so far (0.0 - 1.0)
+        self.progress = 0.0
+
+    def __repr__(self):
+        return (f"ImportResult(read={self.read}, inserted={self.inserted}, "
+                f"duplicates={self.duplicates}, rejected={self.rejected})")
+
+
+def _to_int(value):
+    """Parse an integer ID, accepting "3.0" as written by pandas; None if blank"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(number):
+        return None
+    return int(number)
+
+
+def _to_coordinate(value, limit):
+    """Parse a latitude/longitude, returning 0.0 (the app's "not set") if invalid"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    if math.isnan(number) or abs(number) > limit:
+        return 0.0
+    return number
+
+
+def _to_timestamp(value):
+    """Normalise a timestamp to the app's "%Y-%m-%d %H:%M:%S" format, or None"""
+    value = (value or '').strip()
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d", "%d/%m/%Y %H:%M", "%d/%m/%Y"):
+        try:
+            return datetime.strptime(value, fmt).strftime("%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            continue
+    return None
+
+
+def coerce_row(record):
+    """
+    Turn one CSV record (header -> text) into a submissions row dict.
+    Returns None if the row cannot be imported.
+    """
+    row = {column: (record.get(header) or '').strip() for header, column in CSV_COLUMNS.items()}
+    if not row['plant_name']:
+        return None
+
+    row['id'] = row['id'] or str(uuid.uuid4())[:8]
+    row['submission_time'] = (
+        _to_timestamp(row['submission_time']) or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    )
+    row['user_id'] = _to_int(row['user_id'])
+    row['latitude'] = _to_coordinate(row['latitude'], 90)
+    row['longitude'] = _to_coordinate(row['longitude'], 180)
+    return row
+
+
+def _read_records(f):
+    """
+    Yield each CSV row as a header -> value dict.
+    Older versions of the app appended a "User ID" value without adding it
+    to the header, so a single surplus trailing field is read as the user ID.
+    """
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if header is None:
+        return
+    for fields in reader:
+        if not any(fields):
+            continue
+        record = dict(zip(header, fields))
+        if len(fields) == len(header) + 1 and 'User ID' not in header:
+            record['User ID'] = fields[-1]
+        yield record
+
+
+def _write_chunk(rows, result, path):
+    """Insert a chunk of rows in one transaction"""
+    with db.transaction(path) as conn:
+        # Skip rows that are already in the database, so lookup tables are
+        # only filled for rows that are really inserted
+        ids = [row['id'] for row in rows]
+        placeholders = ', '.join('?' for _ in ids)
+        existing = {
+            r[0] for r in conn.execute(f'SELECT id FROM submissions WHERE id IN ({placeholders})', ids)
+        }
+        new_rows = []
+        for row in rows:
+            if row['id'] in existing:
+                result.duplicates += 1
+            else:
+                existing.add(row['id'])
+                new_rows.append(row)
+
+        conn.executemany(_INSERT, [[row[c] for c in _INSERT_COLUMNS] for row in new_rows])
+        for row in new_rows:
+            submissions.save_terms(conn, row['id'], row['category'], row['tags'])
+        result.inserted += len(new_rows)
+    journal.record_submissions([row['id'] for row in new_rows], path)
+
+
+def import_csv(csv_path, chunk_size=DEFAULT_CHUNK_SIZE, progress=None, path=None):
+    """
+    Import a submissions CSV export into the database.
+    progress, if given, is called with the running ImportResult after each chunk.
+    Returns the final ImportResult.
+    """
+    result = ImportResult()
+    size = os.path.getsize(csv_path) or 1
+    chunk = []
+
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        for record in _read_records(f):
+            result.read += 1
+            row = coerce_row(record)
+            if row is None:
+                result.rejected += 1
+                continue
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                _write_chunk(chunk, result, path)
+                chunk = []
+                result.progress = min(f.buffer.tell() / size, 1.0)
+                if progress:
+                    progress(result)
+        if chunk:
+            _write_chunk(chunk, result, path)
+
+    result.progress = 1.0
+    if progress:
+        progress(result)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import a PlantSpeak CSV export into the database")
+    parser.add_argument('csv_path', help="CSV file to import")
+    parser.add_argument('--db', default=db.DB_PATH, help="SQLite database (default: %(default)s)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="rows per transaction (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    db.migrate(args.db)
+    result = import_csv(
+        args.csv_path,
+        chunk_size=args.chunk_size,
+        progress=lambda r: print(f"{r.progress:6.1%}  {r.read} rows read, {r.inserted} inserted"),
+        path=args.db,
+    )
+    print(f"Done: {result.inserted} inserted, {result.duplicates} already present, "
+          f"{result.rejected} rejected (no plant name)")
+    db.close_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+"""Background processing of submissions.
+
+Work that does not have to finish before the user sees "submission saved",
+such as making image previews or filling in a place name from coordinates,
+is queued in the jobs table and run by worker threads. The app starts a
+few workers in its own process; more can be run separately with:
+    python -m plantspeak.jobs [--workers 2] [--db plantspeak.db]
+
+A job that raises is retried with exponential backoff up to MAX_ATTEMPTS
+times before it is marked failed. Jobs left 'running' by a worker that
+died are put back in the queue after STALE_AFTER seconds.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+import traceback
+
+from plantspeak import db
+
+# Worker threads started by the app (0 to leave the queue to a separate process)
+WORKERS = int(os.environ.get('PLANTSPEAK_WORKERS', 2))
+MAX_ATTEMPTS = 4
+# Seconds before the first retry; doubled for each further attempt
+RETRY_DELAY = 5
+# Seconds an idle worker waits before checking the queue again
+POLL_INTERVAL = 2.0
+# Seconds after which a running job is assumed to belong to a dead worker
+STALE_AFTER = 600
+# Finished jobs included in the latency statistics
+LATENCY_WINDOW = 200
+
+HANDLERS = {}
+
+# Set when a job is queued, so idle workers in this process start at once
+_wakeup = threading.Event()
+
+
+def handler(kind):
+    """Register the function that runs jobs of this kind"""
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind, payload, submission_id=None, conn=None, delay=0):
+    """
+    Queue a job; payload is passed to the handler as keyword arguments.
+    Pass conn to queue the job inside an open transaction, so it is only
+    queued if that transaction commits. Returns the job id.
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f"No handler for {kind} jobs")
+    now = time.time()
+    row = (kind, json.dumps(payload), submission_id, now + delay, now)
+    sql = 'INSERT INTO jobs (kind, payload, submission_id, run_after, created_at) VALUES (?, ?, ?, ?, ?)'
+    if conn is not None:
+        job_id = conn.execute(sql, row).lastrowid
+    else:
+        with db.transaction() as write:
+            job_id = write.execute(sql, row).lastrowid
+    _wakeup.set()
+    return job_id
+
+
+def _claim():
+    """Mark the next due job as running and return it, or None"""
+    now = time.time()
+    # Idle workers poll often, so only take the write lock when a plain
+    # read finds something to claim
+    with db.connection() as conn:
+        claimable = conn.execute('''
+            SELECT EXISTS (SELECT 1 FROM jobs WHERE status = 'queued' AND run_after <= ?)
+                OR EXISTS (SELECT 1 FROM jobs WHERE status = 'running' AND started_at < ?)
+        ''', (now, now - STALE_AFTER)).fetchone()[0]
+    if not claimable:
+        return None
+    with db.transaction() as conn:
+        # Requeue jobs whose worker went away
+        conn.execute(
+            "UPDATE jobs SET status = 'queued' WHERE status = 'running' AND started_at < ?",
+            (now - STALE_AFTER,)
+        )
+        job = conn.execute('''
+            SELECT id, kind, payload, attempts FROM jobs
+            WHERE status = 'queued' AND run_after <= ?
+            ORDER BY run_after, id
+            LIMIT 1
+        ''', (now,)).fetchone()
+        if job is None:
+            return None
+        conn.execute(
+            "UPDATE jobs SET status = 'running', started_at = ?, attempts = attempts + 1 WHERE id = ?",
+            (now, job['id'])
+        )
+    return job
+
+
+def run_next():
+    """Run the next due job, if any; return whether one was run"""
+    job = _claim()
+    if job is None:
+        return False
+    if job['kind'] not in HANDLERS:
+        # The handlers are registered by plantspeak.tasks, imported on first
+        # use so that starting the workers does not load their dependencies
+        from plantspeak import tasks  # noqa: F401
+
+    try:
+        HANDLERS[job['kind']](**json.loads(job['payload']))
+    except Exception as e:
+        attempts = job['attempts'] + 1
+        error = f"{type(e).__name__}: {e}"
+        print(f"Job {job['id']} ({job['kind']}) failed on attempt {attempts}: {error}")
+        traceback.print_exc()
+        with db.transaction() as conn:
+            if attempts < MAX_ATTEMPTS:
+                conn.execute(
+                    "UPDATE jobs SET status = 'queued', run_after = ?, error = ? WHERE id = ?",
+                    (time.time() + RETRY_DELAY * 2 ** (attempts - 1), error, job['id'])
+                )
+            else:
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', finished_at = ?, error = ? WHERE id = ?",
+                    (time.time(), error, job['id'])
+                )
+    else:
+        with db.transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'done', finished_at = ?, error = NULL WHERE id = ?",
+                (time.time(), job['id'])
+            )
+    return True
+
+
+def _work(stop):
+    while not stop.is_set():
+        try:
+            if run_next():
+                continue
+        except Exception as e:
+            # Most likely a locked database; try again after a pause
+            print(f"Job worker error: {e}")
+        _wakeup.wait(POLL_INTERVAL)
+        _wakeup.clear()
+
+
+def start_workers(count=WORKERS):
+    """Start count daemon worker threads; returns an Event that stops them"""
+    stop = threading.Event()
+    for n in range(count):
+        threading.Thread(target=_work, args=(stop,), name=f'plantspeak-job-{n}', daemon=True).start()
+    return stop
+
+
+def submission_status(submission_id):
+    """The jobs queued for a submission, as (kind, status, error) tuples"""
+    with db.connection() as conn:
+        rows = conn.execute(
+            'SELECT kind, status, error FROM jobs WHERE submission_id = ? ORDER BY id', (submission_id,)
+        ).fetchall()
+    return [tuple(row) for row in rows]
+
+
+def queue_stats():
+    """Queue depth per status and recent job latency, for the admin panel"""
+    with db.connection() as conn:
+        depth = dict(conn.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall())
+        oldest = conn.execute(
+            "SELECT MIN(created_at) FROM jobs WHERE status = 'queued'"
+        ).fetchone()[0]
+        recent = conn.execute('''
+            SELECT finished_at - created_at, finished_at - started_at FROM jobs
+            WHERE status = 'done'
+            ORDER BY finished_at DESC
+            LIMIT ?
+        ''', (LATENCY_WINDOW,)).fetchall()
+
+    totals = sorted(r[0] for r in recent)
+    runs = sorted(r[1] for r in recent)
+    return {
+        'depth': depth,
+        'oldest_queued_age': time.time() - oldest if oldest else None,
+        # Time from queueing to completion, and time spent running
+        'latency_p50': totals[len(totals) // 2] if totals else None,
+        'latency_p95': totals[int(len(totals) * 0.95)] if totals else None,
+        'run_time_p50': runs[len(runs) // 2] if runs else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run PlantSpeak background jobs")
+    parser.add_argument('--workers', type=int, default=max(WORKERS, 1), help="worker threads (default: %(default)s)")
+    parser.add_argument('--db', default=db.DB_PATH, help="SQLite database (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    db.DB_PATH = args.db
+    db.migrate()
+    start_workers(args.workers)
+    print(f"Running {args.workers} workers on {args.db}; press Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        db.close_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,337 @@
+"""Append-only journal of submissions.
+
+Every saved or changed submission is appended to a JSON Lines file as a
+snapshot of its full row, so the journal alone is enough to rebuild or
+replicate the submissions table. Each line carries a CRC32 of its content
+so that a line torn by a crash is detected rather than misread.
+
+Rows are appended after the transaction that changed them has committed,
+so the journal is a copy of committed submissions, not a write-ahead
+log: a crash between the commit and the append leaves the change out of
+the journal until "verify --repair" adds it. Each database has its own
+journal; the default database's is JOURNAL_PATH, any other's sits next
+to it (copy.db -> copy.journal.jsonl).
+
+Appends from every session and process are serialised with a lock file.
+Lines are written and flushed at once, but fsync is batched: the file is
+synced at most once per FSYNC_INTERVAL, so a burst of submissions shares
+one disk flush. This matches the database itself, which runs with
+synchronous=NORMAL.
+
+Usage:
+    python -m plantspeak.journal verify [--repair]   # compare with the database
+    python -m plantspeak.journal compact             # keep the latest snapshot per submission
+    python -m plantspeak.journal replay --db copy.db # load the journal into a database
+
+verify and compact work on the journal of --db; replay reads JOURNAL_PATH
+unless --journal names another.
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+from plantspeak import db
+
+JOURNAL_PATH = os.environ.get('PLANTSPEAK_JOURNAL', 'plantspeak_journal.jsonl')
+# Seconds between fsyncs of the journal
+FSYNC_INTERVAL = 0.2
+
+
+def _encode(row, at=None):
+    """One journal line for a submission row, written at time at (default now)"""
+    body = json.dumps(
+        {'op': 'put', 'at': at or datetime.now().strftime("%Y-%m-%d %H:%M:%S"), 'row': row},
+        sort_keys=True, ensure_ascii=False
+    )
+    return f'{body[:-1]}, "crc": {zlib.crc32(body.encode("utf-8"))}}}\n'
+
+
+def _decode(line):
+    """Return the record on a journal line, or None if it is damaged"""
+    try:
+        record = json.loads(line)
+        crc = record.pop('crc')
+    except (ValueError, KeyError, AttributeError):
+        return None
+    body = json.dumps(record, sort_keys=True, ensure_ascii=False)
+    if zlib.crc32(body.encode('utf-8')) != crc:
+        return None
+    return record
+
+
+class Journal:
+    """An append-only JSON Lines journal shared by every process using the file"""
+
+    def __init__(self, path=JOURNAL_PATH, fsync_interval=FSYNC_INTERVAL):
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self._file = None
+        self._last_sync = 0.0
+        self._sync_timer = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        """Hold the journal's lock against other threads and processes"""
+        with self._lock:
+            with open(self.path + '.lock', 'a+b') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+                    else:
+                        lock_file.seek(0)
+                        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _open(self):
+        """The append handle, reopened if the file was replaced by compaction"""
+        if self._file is not None:
+            try:
+                replaced = os.stat(self.path).st_ino != os.fstat(self._file.fileno()).st_ino
+            except FileNotFoundError:
+                replaced = True
+            if replaced:
+                self._file.close()
+                self._file = None
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+            # Start on a fresh line if a crash left the last line unfinished
+            if self._file.tell() > 0:
+                with open(self.path, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        self._file.write('\n')
+        return self._file
+
+    def append(self, rows):
+        """Append a snapshot of each submission row (a dict of column values)"""
+        lines = ''.join(_encode(row) for row in rows)
+        if not lines:
+            return
+        with self._locked():
+            f = self._open()
+            f.write(lines)
+            f.flush()
+            self._schedule_sync()
+
+    def _schedule_sync(self):
+        # Called with the lock held
+        wait = self._last_sync + self.fsync_interval - time.monotonic()
+        if wait <= 0:
+            os.fsync(self._file.fileno())
+            self._last_sync = time.monotonic()
+        elif self._sync_timer is None:
+            self._sync_timer = threading.Timer(wait, self.sync)
+            self._sync_timer.daemon = True
+            self._sync_timer.start()
+
+    def sync(self):
+        """fsync anything appended so far"""
+        with self._lock:
+            self._sync_timer = None
+            if self._file is not None and not self._file.closed:
+                os.fsync(self._file.fileno())
+                self._last_sync = time.monotonic()
+
+    def records(self):
+        """Yield (line number, record or None if the line is damaged)"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as f:
+            for number, line in enumerate(f, 1):
+                if line.strip():
+                    yield number, _decode(line)
+
+    def state(self):
+        """Return ({submission id: latest row}, [damaged line numbers])"""
+        rows = {}
+        damaged = []
+        for number, record in self.records():
+            if record is None:
+                damaged.append(number)
+            else:
+                rows[record['row']['id']] = record['row']
+        return rows, damaged
+
+    def compact(self):
+        """
+        Rewrite the journal with only the latest snapshot of each submission,
+        dropping damaged lines. Returns (lines before, lines after).
+        """
+        with self._locked():
+            before = 0
+            latest = {}
+            for _, record in self.records():
+                before += 1
+                if record is not None:
+                    latest[record['row']['id']] = record
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), prefix='.journal-')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as out:
+                    for record in latest.values():
+                        out.write(_encode(record['row'], record['at']))
+                    out.flush()
+                    os.fsync(out.fileno())
+                os.replace(temp_path, self.path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        return before, len(latest)
+
+
+_journals = {}
+_journals_lock = threading.Lock()
+
+
+def get_journal(path=None):
+    """The shared Journal for a file (JOURNAL_PATH by default)"""
+    path = path or JOURNAL_PATH
+    with _journals_lock:
+        if path not in _journals:
+            _journals[path] = Journal(path)
+        return _journals[path]
+
+
+def journal_path_for(path=None):
+    """The journal file of a database (the default database if path is None)"""
+    if path is None or os.path.abspath(path) == os.path.abspath(db.DB_PATH):
+        return JOURNAL_PATH
+    return os.path.splitext(path)[0] + '.journal.jsonl'
+
+
+def _stored_columns(conn):
+    """Columns of the submissions table, without generated ones"""
+    # table_xinfo marks generated columns as hidden 2 (virtual) or 3 (stored)
+    return [row['name'] for row in conn.execute('PRAGMA table_xinfo(submissions)') if row['hidden'] == 0]
+
+
+def snapshot(conn, submission_ids):
+    """Current rows of the given submissions, as dicts of stored columns"""
+    columns = _stored_columns(conn)
+    rows = []
+    for start in range(0, len(submission_ids), 500):
+        chunk = submission_ids[start:start + 500]
+        rows.extend(dict(row) for row in conn.execute(
+            f"SELECT {', '.join(columns)} FROM submissions WHERE id IN ({', '.join('?' for _ in chunk)})", chunk
+        ))
+    return rows
+
+
+def record_submissions(submission_ids, path=None, journal_path=None):
+    """
+    Append the current rows of the given submissions in database path to
+    its journal, or to journal_path. Call after the transaction that
+    changed them has committed.
+    """
+    with db.connection(path) as conn:
+        rows = snapshot(conn, list(submission_ids))
+    get_journal(journal_path or journal_path_for(path)).append(rows)
+
+
+def verify(path=None, repair=False, journal_path=None):
+    """
+    Compare the journal's latest snapshots with the database.
+    Returns {'missing': ids not in the journal, 'not_in_db': ids only in the
+    journal, 'different': ids whose rows differ, 'damaged': line numbers}.
+    With repair=True, the database rows of missing and differing submissions
+    are appended to the journal. The journal is the database's own unless
+    journal_path is given.
+    """
+    journal_path = journal_path or journal_path_for(path)
+    journal_rows, damaged = get_journal(journal_path).state()
+    missing, different = [], []
+    with db.connection(path) as conn:
+        columns = _stored_columns(conn)
+        seen = set()
+        for row in conn.execute(f"SELECT {', '.join(columns)} FROM submissions"):
+            row = dict(row)
+            seen.add(row['id'])
+            logged = journal_rows.get(row['id'])
+            if logged is None:
+                missing.append(row['id'])
+            elif any(logged.get(column) != row[column] for column in columns):
+                different.append(row['id'])
+    report = {
+        'missing': missing,
+        'not_in_db': [submission_id for submission_id in journal_rows if submission_id not in seen],
+        'different': different,
+        'damaged': damaged,
+    }
+    if repair and (missing or different):
+        record_submissions(missing + different, path, journal_path)
+    return report
+
+
+def replay(path=None, journal_path=None):
+    """
+    Insert or replace every submission in a journal (JOURNAL_PATH by
+    default) into a database; returns the count
+    """
+    rows, _ = get_journal(journal_path).state()
+    from plantspeak.submissions import save_terms
+    with db.transaction(path) as conn:
+        columns = _stored_columns(conn)
+        # An upsert rather than INSERT OR REPLACE, so the search index
+        # triggers see an update instead of a silent delete
+        sql = (
+            f"INSERT INTO submissions ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)}) "
+            f"ON CONFLICT (id) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in columns if c != 'id')}"
+        )
+        for row in rows.values():
+            conn.execute(sql, [row.get(column) for column in columns])
+            conn.execute('DELETE FROM submission_categories WHERE submission_id = ?', (row['id'],))
+            conn.execute('DELETE FROM submission_tags WHERE submission_id = ?', (row['id'],))
+            save_terms(conn, row['id'], row.get('category'), row.get('tags'))
+    return len(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check or maintain the PlantSpeak submissions journal")
+    parser.add_argument('command', choices=['verify', 'compact', 'replay'])
+    parser.add_argument('--db', default=db.DB_PATH, help="SQLite database (default: %(default)s)")
+    parser.add_argument('--journal', help=f"journal file (default: that of --db; for replay, {JOURNAL_PATH})")
+    parser.add_argument('--repair', action='store_true', help="with verify: append missing or outdated rows")
+    args = parser.parse_args(argv)
+
+    if args.command == 'replay':
+        journal_path = args.journal or JOURNAL_PATH
+    else:
+        journal_path = args.journal or journal_path_for(args.db)
+    db.migrate(args.db)
+    if args.command == 'verify':
+        report = verify(args.db, repair=args.repair, journal_path=journal_path)
+        for key, label in (('missing', "not in the journal"), ('different', "differ from the journal"),
+                           ('not_in_db', "only in the journal"), ('damaged', "damaged journal lines")):
+            print(f"{len(report[key])} {label}" + (f": {', '.join(map(str, report[key][:10]))}" if report[key] else ""))
+        if args.repair and (report['missing'] or report['different']):
+            print("Appended the database rows of missing and differing submissions")
+    elif args.command == 'compact':
+        before, after = get_journal(journal_path).compact()
+        print(f"Compacted {before} lines to {after}")
+    else:
+        print(f"Replayed {replay(args.db, journal_path)} submissions into {args.db}")
+    get_journal(journal_path).sync()
+    db.close_all()
+
+
+if __name__ == '__main__':
+    main()
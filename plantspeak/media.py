@@ -0,0 +1,174 @@
+"""Content-addressed storage for uploaded photos, recordings and note scans.
+
+Each file is stored once under the SHA-256 of its content, in fan-out
+directories (uploads/media/ab/cd/abcd....jpg) so no directory grows too
+large. Uploads are copied to a temporary file in fixed-size chunks while
+being hashed, then renamed into place, so a half-written file is never
+visible and the same photo uploaded twice takes up space once. The media
+table records each stored file's size and type; submissions refer to it
+by hash.
+
+Files no submission refers to, such as voice recordings replaced by their
+compact copy, are deleted once they have not been handed out by store()
+for PRUNE_AGE seconds. Storing and pruning both take the write lock, so an
+upload that is given an existing file never has it pruned before its
+submission is saved. To prune the whole store:
+    python -m plantspeak.media [--db plantspeak.db]
+"""
+import argparse
+import hashlib
+import mimetypes
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from plantspeak import db
+
+MEDIA_ROOT = os.environ.get('PLANTSPEAK_MEDIA', os.path.join('uploads', 'media'))
+# Bytes read from an upload at a time
+CHUNK_SIZE = 1024 * 1024
+# Seconds an unused file is kept after it was last stored
+PRUNE_AGE = 3600
+
+
+class StoredMedia:
+    """A file in the media store"""
+
+    def __init__(self, sha256, path, size, mime):
+        self.sha256 = sha256
+        self.path = path
+        self.size = size
+        self.mime = mime
+
+    def __repr__(self):
+        return f"StoredMedia({self.sha256[:12]}…, {self.path!r}, {self.size} bytes)"
+
+
+def media_path(sha256, extension=''):
+    """Where a file with this hash is stored, two directory levels deep"""
+    return os.path.join(MEDIA_ROOT, sha256[:2], sha256[2:4], sha256 + extension.lower())
+
+
+def _copy_and_hash(f, directory):
+    """Copy file object f to a temporary file in directory; return (temp path, sha256, size)"""
+    digest = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.upload-')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+            out.flush()
+            os.fsync(out.fileno())
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return temp_path, digest.hexdigest(), size
+
+
+def store(f, filename='', mime=None, path=None):
+    """
+    Store the content of binary file object f, read from its current position.
+    filename is only used for its extension and, if mime is not given, to
+    guess the MIME type; path is the database to record it in. Returns a
+    StoredMedia; storing content that is already in the store returns the
+    existing file.
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    mime = mime or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    os.makedirs(MEDIA_ROOT, exist_ok=True)
+
+    temp_path, sha256, size = _copy_and_hash(f, MEDIA_ROOT)
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    try:
+        with db.transaction(path) as conn:
+            existing = conn.execute(
+                'SELECT sha256, path, size, mime FROM media WHERE sha256 = ?', (sha256,)
+            ).fetchone()
+            if existing is not None and os.path.exists(existing['path']):
+                # Keep it from being pruned while the caller saves its submission
+                conn.execute('UPDATE media SET stored_at = ? WHERE sha256 = ?', (now, sha256))
+                return StoredMedia(*existing)
+
+            file_path = media_path(sha256, extension)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            # Atomic on POSIX and Windows, so a half-written file is never visible
+            os.replace(temp_path, file_path)
+            temp_path = None
+            conn.execute(
+                'INSERT OR REPLACE INTO media (sha256, path, size, mime, created_at, stored_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (sha256, file_path, size, mime, now, now)
+            )
+    finally:
+        if temp_path is not None:
+            os.unlink(temp_path)
+    return StoredMedia(sha256, file_path, size, mime)
+
+
+def store_upload(uploaded_file):
+    """Store a Streamlit UploadedFile"""
+    uploaded_file.seek(0)
+    return store(uploaded_file, uploaded_file.name, uploaded_file.type)
+
+
+def get(sha256, path=None):
+    """The stored file with this hash, or None"""
+    with db.connection(path) as conn:
+        row = conn.execute('SELECT sha256, path, size, mime FROM media WHERE sha256 = ?', (sha256,)).fetchone()
+    return StoredMedia(*row) if row else None
+
+
+def prune(sha256s=None, older_than=PRUNE_AGE, path=None):
+    """
+    Delete the stored files no submission refers to that have not been
+    stored for older_than seconds; only those in sha256s if given. Returns
+    the number of files deleted.
+    """
+    cutoff = datetime.fromtimestamp(time.time() - older_than).strftime("%Y-%m-%d %H:%M:%S")
+    sql = '''
+        SELECT sha256, path FROM media m
+        WHERE COALESCE(stored_at, created_at, '') < ?
+          AND NOT EXISTS (
+              SELECT 1 FROM submissions
+              WHERE photo_sha256 = m.sha256 OR voice_sha256 = m.sha256 OR notes_sha256 = m.sha256
+          )
+    '''
+    params = [cutoff]
+    if sha256s is not None:
+        sha256s = list(sha256s)
+        if not sha256s:
+            return 0
+        sql += f" AND sha256 IN ({', '.join('?' for _ in sha256s)})"
+        params.extend(sha256s)
+
+    with db.transaction(path) as conn:
+        unused = conn.execute(sql, params).fetchall()
+        for row in unused:
+            conn.execute('DELETE FROM media WHERE sha256 = ?', (row['sha256'],))
+            # Inside the transaction, so store() cannot hand the file out in between
+            if os.path.exists(row['path']):
+                os.unlink(row['path'])
+    return len(unused)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Delete stored media no submission refers to")
+    parser.add_argument('--db', default=db.DB_PATH, help="SQLite database (default: %(default)s)")
+    parser.add_argument('--older-than', type=int, default=PRUNE_AGE,
+                        help="seconds since a file was last stored (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    db.migrate(args.db)
+    print(f"Deleted {prune(older_than=args.older_than, path=args.db)} unused files")
+    db.close_all()
+
+
+if __name__ == '__main__':
+    main()
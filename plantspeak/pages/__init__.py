@@ -0,0 +1,6 @@
+"""The pages of the app.
+
+Each module draws one page with render() and imports what that page needs,
+so app.py loads pandas, Pillow and the other heavy libraries only once a
+page that uses them is shown.
+"""
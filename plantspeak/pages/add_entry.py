@@ -0,0 +1,408 @@
+"""The Add Entry page: the five-step form for a new plant knowledge entry.
+
+Steps 1-4 are fragments (Streamlit 1.37+), so changing one of their
+widgets reruns only that step instead of the whole script. Older versions
+of Streamlit have no fragments and rerun everything as before. Location
+lookups may call web services, so they run in the background and the form
+stays usable; pending lookups are kept in session state and their answers
+picked up on a later rerun.
+"""
+import os
+import sqlite3
+import time
+import uuid
+from datetime import datetime
+from functools import wraps
+
+import pandas as pd
+import streamlit as st
+from streamlit.errors import StreamlitAPIException
+
+from plantspeak import audio, cache, db, geo, journal, media, previews, session, submissions, tasks
+from plantspeak.i18n import get_text
+
+fragment = getattr(st, 'fragment', lambda func: func)
+
+
+def start_location_lookup(name, fn, *args):
+    """Start fn(*args) in the background as the lookup called name"""
+    if 'location_lookups' not in st.session_state:
+        st.session_state.location_lookups = {}
+    st.session_state.location_lookups[name] = geo.start_lookup(fn, *args)
+
+
+def location_lookup_pending(name=None):
+    """Whether the named lookup, or any lookup, is still running"""
+    lookups = st.session_state.get('location_lookups', {})
+    names = [name] if name else list(lookups)
+    return any(n in lookups and lookups[n].status() == 'pending' for n in names)
+
+
+def finished_location_lookup(name):
+    """Return the named lookup once it has finished or timed out, forgetting it"""
+    lookups = st.session_state.get('location_lookups', {})
+    lookup = lookups.get(name)
+    if lookup is None or lookup.status() == 'pending':
+        return None
+    del lookups[name]
+    return lookup
+
+
+def rerun_while_looking_up():
+    """
+    Rerun the script until the answers of background location lookups have
+    been applied to the form. Called at the end of a full run; in a rerun of
+    the location step alone, the step polls by itself.
+    """
+    if st.session_state.get('location_lookups'):
+        if location_lookup_pending():
+            time.sleep(geo.LOOKUP_POLL_INTERVAL)
+        st.rerun()
+
+
+def rerun_fragment():
+    """
+    Rerun just the fragment being drawn. Returns False instead when it is
+    being drawn as part of a full script run, or fragments are not supported.
+    """
+    if not hasattr(st, 'fragment'):
+        return False
+    try:
+        st.rerun(scope='fragment')
+    except StreamlitAPIException:
+        return False
+
+
+def entry_step(func):
+    """Draw one step of the form as a fragment, recording its runs"""
+    @fragment
+    @wraps(func)
+    def step():
+        started = time.perf_counter()
+        try:
+            func()
+        finally:
+            session.record_run(func.__name__, time.perf_counter() - started)
+    return step
+
+
+def save_submission_to_db(
+    submission_id, user_id, submission_time, plant_name, entry_title, local_names, scientific_name,
+    category, usage_desc, prep_method, community, tags, location, language, lat, lon,
+    photo_path, voice_path, notes_path, age_group="", submitter_role="", submitter_name="", contact_info="", consent="",
+    stored_media=None
+):
+    """Save a plant submission to the database and journal, and queue its background processing"""
+    stored_media = stored_media or {}
+    row = {
+        'id': submission_id, 'user_id': user_id, 'submission_time': submission_time, 'plant_name': plant_name,
+        'entry_title': entry_title, 'local_names': local_names, 'scientific_name': scientific_name,
+        'category': category, 'usage_desc': usage_desc, 'prep_method': prep_method, 'community': community,
+        'tags': tags, 'location': location, 'language': language, 'latitude': lat, 'longitude': lon,
+        'photo_path': photo_path, 'voice_path': voice_path, 'notes_path': notes_path, 'age_group': age_group,
+        'submitter_role': submitter_role, 'submitter_name': submitter_name, 'contact_info': contact_info,
+        'consent': consent,
+        'photo_sha256': stored_media['photo'].sha256 if 'photo' in stored_media else None,
+        'voice_sha256': stored_media['voice'].sha256 if 'voice' in stored_media else None,
+        'notes_sha256': stored_media['notes'].sha256 if 'notes' in stored_media else None,
+    }
+    try:
+        with db.transaction() as conn:
+            conn.execute(
+                f"INSERT INTO submissions ({', '.join(row)}) VALUES ({', '.join('?' for _ in row)})",
+                list(row.values())
+            )
+            submissions.save_terms(conn, submission_id, category, tags)
+            tasks.queue_submission_jobs(conn, submission_id, stored_media, bool(lat and lon), location)
+        # Cached browse results no longer include everything
+        cache.invalidate()
+        journal.record_submissions([submission_id])
+        return True
+    except sqlite3.OperationalError as e:
+        # Handle locked database
+        print(f"Database locked error: {e}")
+    except Exception as e:
+        # Handle other errors
+        print(f"Database error: {e}")
+    # Keep the submission in the journal so it can be recovered with
+    # python -m plantspeak.journal replay
+    journal.get_journal().append([row])
+    return False
+
+
+def render():
+    """The title, the form and what happens when it is submitted"""
+    st.title(get_text('app_main_title', st.session_state.selected_language))
+
+    st.markdown(get_text('app_description', st.session_state.selected_language))
+
+    # Steps 1-4 are fragments that rerun on their own; their answers are
+    # kept in session state under entry_* keys and read when submitting
+    @entry_step
+    def plant_step():
+        st.header(get_text('step1_header', st.session_state.selected_language))
+        photo = st.file_uploader(get_text('upload_photo', st.session_state.selected_language), type=["jpg", "jpeg", "png"], key='entry_photo')
+        if photo:
+            st.image(previews.render(photo, 'thumb'), caption="Uploaded Plant Photo")
+        st.text_input(get_text('plant_name_input', st.session_state.selected_language), key='entry_plant_name')
+        st.text_input(get_text('entry_title_input', st.session_state.selected_language), help="A title for your submission", key='entry_title')
+
+    @entry_step
+    def uses_step():
+        st.header(get_text('step2_header', st.session_state.selected_language))
+        st.text_area(get_text('local_names_input', st.session_state.selected_language), help="List local names in various languages or dialects", key='entry_local_names')
+        st.text_input(get_text('scientific_name_input', st.session_state.selected_language), key='entry_scientific_name')
+
+        st.multiselect(get_text('category_select', st.session_state.selected_language), [
+            "Medicinal", "Food / Cooking", "Religious / Ritual",
+            "Ecological / Environmental", "Craft / Utility", "Other"
+        ], key='entry_category')
+
+        st.text_area(get_text('usage_desc_input', st.session_state.selected_language), help="E.g., Used to treat fever, offered in rituals, made into tea", key='entry_usage_desc')
+        st.text_area(get_text('prep_method_input', st.session_state.selected_language), help="How is it prepared, how much is used, and how often?", key='entry_prep_method')
+        st.text_input(get_text('community_input', st.session_state.selected_language), help="Mention tribe, village, or community", key='entry_community')
+        st.text_input(get_text('tags_input', st.session_state.selected_language), help="Separate by commas, e.g. headache, fever, forest plant", key='entry_tags')
+
+    @entry_step
+    def location_step():
+        st.header(get_text('step3_header', st.session_state.selected_language))
+
+        # Apply the answers of location lookups that finished since the last
+        # rerun, before the widgets they fill in are drawn
+        location_messages = []
+        lookup = finished_location_lookup('search')
+        if lookup is not None:
+            if lookup.status() == 'done' and lookup.result()[0] is not None:
+                found_lat, found_lon = lookup.result()
+                st.session_state.entry_lat = found_lat
+                st.session_state.entry_lon = found_lon
+                location_messages.append(('success', f"Found coordinates: {found_lat}, {found_lon}"))
+            else:
+                location_messages.append(('error', f"Could not find location: {lookup.args[0]}"))
+        lookup = finished_location_lookup('ip')
+        if lookup is not None:
+            if lookup.status() == 'done' and lookup.result()[0] is not None:
+                lat_value, lon_value = lookup.result()
+                st.session_state.entry_lat = lat_value
+                st.session_state.entry_lon = lon_value
+                location_messages.append(('success', f"Located at approximately: {lat_value}, {lon_value}"))
+            elif lookup.status() == 'failed':
+                location_messages.append(('error', f"Could not detect location: {lookup.error()}"))
+            else:
+                location_messages.append(('error', "Could not detect location, please try again or enter it manually"))
+        lookup = finished_location_lookup('reverse')
+        if lookup is not None and lookup.status() == 'done' and lookup.result():
+            place_name = lookup.result()
+            # Only fill in the name if the user has not typed one meanwhile
+            if not st.session_state.get('entry_location'):
+                st.session_state.entry_location = place_name
+            location_messages.append(('success', f"Location detected: {place_name}"))
+
+        location = st.text_input(get_text('location_input', st.session_state.selected_language), help="Village, District, State", key='entry_location')
+        st.text_input(get_text('language_input', st.session_state.selected_language), key='entry_language')
+
+        st.write("📍 **Geographic Location**")
+        for level, message in location_messages:
+            getattr(st, level)(message)
+
+        # Options for location entry
+        loc_tab1, loc_tab2, loc_tab3 = st.tabs(["� Enter Name", "📱 Auto-Detect", "🔍 Enter Coordinates"])
+
+        # Define session state to track changes in lat/lon
+        if 'prev_lat' not in st.session_state:
+            st.session_state.prev_lat = 0.0
+        if 'prev_lon' not in st.session_state:
+            st.session_state.prev_lon = 0.0
+
+        # Tab 1: Search location by name
+        with loc_tab1:
+            search_loc = st.text_input("🔍 Search for a location", help="Enter a place name, landmark, or address")
+            if search_loc:
+                if st.button("🔎 Find Location"):
+                    start_location_lookup('search', geo.forward_geocode, search_loc)
+            if location_lookup_pending('search'):
+                st.info("Searching location...")
+
+        # Tab 2: Auto-detect location
+        with loc_tab2:
+            # Auto-location functionality
+            st.info("This feature uses IP-based geolocation and may not be precise. Results may vary based on network setup.")
+
+            if st.button("📱 Get My Location (Approx)"):
+                start_location_lookup('ip', geo.ip_locate)
+            if location_lookup_pending('ip'):
+                st.info("Getting your approximate location...")
+
+            st.write("Or use an online service:")
+            st.markdown("[🔍 Find My Coordinates](https://www.latlong.net/) (copy & paste back here)")
+
+        # Tab 3: Manual coordinate entry
+        with loc_tab3:
+            col1, col2 = st.columns(2)
+
+            with col1:
+                lat = st.number_input("📌 Latitude", format="%.6f", key='entry_lat')
+
+            with col2:
+                lon = st.number_input("📌 Longitude", format="%.6f", key='entry_lon')
+
+        # Display map with the coordinates
+        if lat != 0 and lon != 0:
+            st.map(data=pd.DataFrame({'lat': [lat], 'lon': [lon]}), zoom=12)
+
+            # Check if coordinates have changed significantly (at least 0.0001 degrees difference)
+            coords_changed = (abs(lat - st.session_state.prev_lat) > 0.0001 or
+                             abs(lon - st.session_state.prev_lon) > 0.0001)
+
+            # Auto-fill location name if valid coordinates and they've changed
+            if coords_changed:
+                st.session_state.prev_lat = lat
+                st.session_state.prev_lon = lon
+
+                # Add a button to get location name from coordinates
+                if st.button("📍 Get Location Name from Coordinates") or (location == "" and coords_changed):
+                    start_location_lookup('reverse', geo.reverse_geocode, lat, lon)
+            if location_lookup_pending('reverse'):
+                st.info("Getting location name...")
+
+        # Rerun this step until the answers of background lookups have been
+        # applied; in a full run this is left to the end of the script
+        if st.session_state.get('location_lookups') and hasattr(st, 'fragment'):
+            if location_lookup_pending():
+                time.sleep(geo.LOOKUP_POLL_INTERVAL)
+            rerun_fragment()
+
+    @entry_step
+    def extras_step():
+        # Step 4: Voice & Text Extras
+        st.header(get_text('step4_header', st.session_state.selected_language))
+        voice_note = st.file_uploader(get_text('voice_upload', st.session_state.selected_language), type=["mp3", "wav", "m4a"], key='entry_voice')
+        if voice_note:
+            st.audio(voice_note, format=voice_note.type or audio.mime_type(voice_note.name))
+        notes_scan = st.file_uploader(get_text('notes_upload', st.session_state.selected_language), type=["jpg", "jpeg", "png", "pdf"], key='entry_notes')
+        if notes_scan:
+            if notes_scan.type == "application/pdf":
+                st.write("PDF uploaded: ", notes_scan.name)
+            else:
+                st.image(previews.render(notes_scan, 'thumb'), caption="Scanned Notes")
+
+    plant_step()
+    uses_step()
+    location_step()
+    extras_step()
+
+    # Step 5: About You. Together with the submit button it is a form, so
+    # nothing reruns until the entry is submitted.
+    with st.form('entry_about_you'):
+        st.header(get_text('step5_header', st.session_state.selected_language))
+        age_group = st.selectbox(get_text('age_group_select', st.session_state.selected_language), ["", "18–30", "31–50", "51–70", "70+"])
+        role = st.text_input("Your Role", help="Farmer, Healer, Grandparent, Herbalist, Teacher, Student, etc.")
+        user_name = st.text_input("Your Name")
+        contact_info = st.text_input("Contact Info (Email/Phone)")
+        consent = st.radio("1️⃣2️⃣ Do You Give Permission to Use This Data?", [
+            "Yes, I give permission (anonymously)", "No, keep private"
+        ])
+        submitted = st.form_submit_button(get_text('submit_button', st.session_state.selected_language))
+
+    if submitted:
+        # The answers to steps 1-4
+        entry = st.session_state
+        plant_name = entry.entry_plant_name
+        photo = entry.entry_photo
+        voice_note = entry.entry_voice
+        notes_scan = entry.entry_notes
+        category = entry.entry_category
+        location = entry.entry_location
+        lat = entry.entry_lat
+        lon = entry.entry_lon
+
+        # Validate the required fields
+        missing_fields = []
+
+        if not plant_name:
+            missing_fields.append("Plant name")
+        if not voice_note:
+            missing_fields.append("Voice recording")
+        if not notes_scan:
+            missing_fields.append("Handwritten or printed notes")
+        if not age_group or age_group == "":
+            missing_fields.append("Age group")
+        if not role:
+            missing_fields.append("Your role")
+        if not user_name:
+            missing_fields.append("Your name")
+        if not contact_info:
+            missing_fields.append("Contact information")
+
+        if missing_fields:
+            st.error(f"Please fill in all required fields: {', '.join(missing_fields)}")
+        else:
+            st.success("Thank you for sharing your knowledge! Your input will help preserve traditional plant wisdom.")
+
+            # Generate a unique ID for this submission
+            submission_id = str(uuid.uuid4())[:8]
+            submission_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            st.write("Submitted at:", submission_time)
+            st.write("Submission ID:", submission_id)
+
+            # Uploaded media, stored once per distinct file content
+            photo_path = ""
+            voice_path = ""
+            notes_path = ""
+            stored_media = {}
+            for field, upload, label in (
+                ('photo', photo, "photo"), ('voice', voice_note, "voice recording"), ('notes', notes_scan, "notes scan")
+            ):
+                if upload:
+                    try:
+                        stored_media[field] = media.store_upload(upload)
+                    except Exception as e:
+                        st.error(f"Error saving {label}: {e}")
+            if 'photo' in stored_media:
+                photo_path = stored_media['photo'].path
+            if 'voice' in stored_media:
+                voice_path = stored_media['voice'].path
+            if 'notes' in stored_media:
+                notes_path = stored_media['notes'].path
+
+            # Add user information from session
+            user_id = st.session_state.user_info['id'] if st.session_state.user_info else None
+
+            # Store in SQLite database
+            db_save_success = save_submission_to_db(
+                submission_id, user_id, submission_time, plant_name, entry.entry_title, entry.entry_local_names,
+                entry.entry_scientific_name, ", ".join(category) if category else "", entry.entry_usage_desc,
+                entry.entry_prep_method, entry.entry_community, entry.entry_tags,
+                location, entry.entry_language, lat, lon, photo_path, voice_path, notes_path,
+                age_group, role, user_name, contact_info, consent,
+                stored_media=stored_media
+            )
+
+            if db_save_success:
+                st.success("Submission saved to database successfully")
+                st.caption("Previews and other processing will be ready shortly.")
+            else:
+                st.warning("Note: Your submission was saved locally but there was an issue with the database. An administrator has been notified.")
+
+            for label, path in (("Photo", photo_path), ("Voice recording", voice_path), ("Notes", notes_path)):
+                if path:
+                    st.success(f"{label} saved as {os.path.basename(path)}")
+
+            # Display summary of submission
+            st.subheader("📋 Submission Summary")
+            summary_data = {
+                "Plant Name": plant_name,
+                "Entry Title": entry.entry_title if entry.entry_title else "Not provided",
+                "Categories": ", ".join(category) if category else "None selected",
+                "Location": location if location else "Not provided",
+                "Date & Time": submission_time
+            }
+            st.json(summary_data)
+
+            # Script and step runs it took to fill in this entry, for the debug panel
+            run_stats = st.session_state.get('run_stats', {})
+            previous = st.session_state.get('run_stats_at_submission', {})
+            st.session_state.runs_per_submission = {
+                name: runs - previous.get(name, (0, 0.0))[0] for name, (runs, _) in run_stats.items()
+            }
+            st.session_state.run_stats_at_submission = dict(run_stats)
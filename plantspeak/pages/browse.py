@@ -0,0 +1,433 @@
+"""The View Submissions page: filtered, paginated browsing, maps and exports."""
+import io
+import os
+import time
+
+import pandas as pd
+import pydeck as pdk
+import streamlit as st
+from streamlit.runtime.media_file_manager import MediaFileManager
+
+from plantspeak import audio, cache, export, geo, importer, jobs, previews, session, spatial, submissions
+from plantspeak.i18n import get_text
+
+
+# Newer Streamlit releases accept a function as download data and call it on click
+DEFERRED_DOWNLOADS = hasattr(MediaFileManager, 'add_deferred')
+
+
+def export_builder(query, export_format):
+    """
+    Return a function writing the export of query, which Streamlit calls
+    only when the download button is clicked. Streamlit keeps downloads in
+    memory, so the export is written to memory too.
+    """
+    def build():
+        out = io.BytesIO()
+        export.export(query, export_format, out)
+        return out.getvalue()
+    return build
+
+
+def map_centre(place):
+    """
+    Return (lat, lon) for the place the map is centred on, (None, None) if
+    it could not be found, or None while it is being looked up. The place is
+    geocoded in the background, once per change of the text.
+    """
+    located = st.session_state.get('map_located')
+    if located and located[0] == place:
+        return located[1]
+    lookup = st.session_state.get('map_lookup')
+    if lookup is None or lookup.args != (place,):
+        # A lookup of an earlier text is dropped, finished or not
+        st.session_state.map_lookup = geo.start_lookup(geo.forward_geocode, place)
+        return None
+    status = lookup.status()
+    if status == 'pending':
+        return None
+    del st.session_state.map_lookup
+    if status == 'done':
+        centre = lookup.result()
+    else:
+        if status == 'failed':
+            print(f"Map location search failed: {lookup.error()}")
+        centre = (None, None)
+    st.session_state.map_located = (place, centre)
+    return centre
+
+
+def rerun_while_locating():
+    """
+    Rerun the script until the map's place has been looked up. Called at
+    the end of a full run; the map keeps its lookup apart from the Add Entry
+    form's, which are polled by that form.
+    """
+    lookup = st.session_state.get('map_lookup')
+    if lookup is None:
+        return
+    if lookup.status() == 'pending':
+        time.sleep(geo.LOOKUP_POLL_INTERVAL)
+    elif st.session_state.get('map_lookup_shown') is lookup:
+        # Already rerun once to show its answer, and the map was not drawn
+        return
+    else:
+        # Finished after the map was drawn; rerun once to show it
+        st.session_state.map_lookup_shown = lookup
+    st.rerun()
+
+
+def draw_clusters(clusters):
+    """Draw grid clusters as circles sized by their count; returns their DataFrame"""
+    cluster_df = pd.DataFrame(clusters)
+    # Marker area grows with the number of submissions in the cell
+    cluster_df['radius'] = cluster_df['count'] ** 0.5
+    st.pydeck_chart(pdk.Deck(
+        layers=[pdk.Layer(
+            'ScatterplotLayer', cluster_df,
+            get_position=['longitude', 'latitude'], get_radius='radius',
+            radius_scale=4, radius_min_pixels=4, radius_max_pixels=40,
+            radius_units='pixels', get_fill_color=[46, 139, 87, 160], pickable=True,
+        )],
+        initial_view_state=pdk.data_utils.compute_view(
+            cluster_df[['longitude', 'latitude']].values.tolist()
+        ),
+        tooltip={'text': '{count} submissions'},
+    ))
+    return cluster_df
+
+
+def render():
+    """Filters, the current page of submissions, details, the map and downloads"""
+    st.title("📚 Past Submissions")
+
+    # Get current user ID if logged in
+    current_user_id = st.session_state.user_info['id'] if 'user_info' in st.session_state else None
+
+    # Only the current page of submissions is loaded from the database
+    if session.cached(('any', current_user_id), lambda: submissions.has_visible_submissions(current_user_id)):
+        # Add filtering options
+        st.subheader("🔍 Filter Submissions")
+        col1, col2, col3, col4 = st.columns(4)
+
+        # Counts for the dropdowns, computed by the database
+        facet_query = submissions.SubmissionQuery(current_user_id)
+        facet_counts = session.cached(('facets', facet_query.key()), lambda: submissions.facets(facet_query))
+        category_counts = dict(facet_counts['category'])
+        tag_counts = dict(facet_counts['tag'])
+
+        with col1:
+            # Filter by category
+            selected_category = st.selectbox(
+                "Filter by Category", 
+                ["All"] + sorted(category_counts),
+                format_func=lambda c: c if c == "All" else f"{c} ({category_counts[c]})"
+            )
+
+        with col2:
+            # Filter by tag, most used first
+            selected_tag = st.selectbox(
+                "Filter by Tag",
+                ["All"] + [tag for tag, _ in facet_counts['tag']],
+                format_func=lambda t: t if t == "All" else f"{t} ({tag_counts[t]})"
+            )
+
+        with col3:
+            # Full-text search over names, uses, tags and places in any language
+            search_term = st.text_input("Search names, uses, tags or places")
+
+        with col4:
+            # Filter by user
+            show_only_mine = st.checkbox("Show only my submissions", value=False)
+
+        # Apply filters in the database query
+        browse_query = submissions.SubmissionQuery(current_user_id)
+
+        if selected_category and selected_category != "All":
+            browse_query.category(selected_category)
+
+        if selected_tag and selected_tag != "All":
+            browse_query.tag(selected_tag)
+
+        if search_term:
+            browse_query.search(search_term)
+
+        if show_only_mine and st.session_state.user_info:
+            browse_query.mine()
+
+        page_size = st.selectbox(
+            "Submissions per page",
+            submissions.PAGE_SIZES,
+            index=submissions.PAGE_SIZES.index(submissions.DEFAULT_PAGE_SIZE)
+        )
+
+        # Go back to the first page whenever the filters or page size change.
+        # browse_cursors holds the keyset cursor that starts each page seen so far.
+        browse_key = (selected_category, selected_tag, search_term, show_only_mine, page_size)
+        if st.session_state.get('browse_key') != browse_key:
+            st.session_state.browse_key = browse_key
+            st.session_state.browse_cursors = [None]
+        cursors = st.session_state.browse_cursors
+
+        page_rows, next_cursor = session.cached(
+            ('page', browse_query.key(), cursors[-1], page_size),
+            lambda: submissions.fetch_page(browse_query, cursors[-1], page_size)
+        )
+        match_count = session.cached(('count', browse_query.key()), lambda: submissions.count(browse_query))
+        filtered_df = pd.DataFrame(page_rows)
+
+        # Show filtered results
+        st.subheader(f"Showing {match_count} submissions (page {len(cursors)})")
+
+        # Display a more user-friendly version of the dataframe
+        if not filtered_df.empty:
+            display_df = filtered_df[['id', 'plant_name', 'entry_title', 'scientific_name', 
+                                     'category', 'location', 'submission_time', 'submitter_name']]
+            display_df.columns = ['ID', 'Plant Name', 'Title', 'Scientific Name', 
+                                 'Category', 'Location', 'Date & Time', 'Submitted By']
+            # Search results come with the matching text highlighted
+            if 'snippet' in filtered_df:
+                display_df.insert(2, 'Match', filtered_df['snippet'])
+            st.dataframe(display_df)
+
+        # Page navigation
+        nav_col1, nav_col2 = st.columns(2)
+        with nav_col1:
+            if st.button("⬅️ Previous page", disabled=len(cursors) == 1):
+                cursors.pop()
+                st.rerun()
+        with nav_col2:
+            if st.button("Next page ➡️", disabled=next_cursor is None):
+                cursors.append(next_cursor)
+                st.rerun()
+
+        # Display selected entry
+        if not filtered_df.empty:
+            st.subheader("📖 View Details")
+            submission_ids = filtered_df['id'].tolist()
+            submission_names = [f"{row['plant_name']} ({row['id']})" for _, row in filtered_df.iterrows()]
+            selected_idx = st.selectbox("Select a submission to view details", 
+                                      range(len(submission_ids)),
+                                      format_func=lambda i: submission_names[i])
+
+            if selected_idx is not None:
+                selected_id = submission_ids[selected_idx]
+                entry = filtered_df[filtered_df['id'] == selected_id].iloc[0]
+                # Originals keep their EXIF data (GPS position, camera), so
+                # only the contributor can open them; others see the previews
+                is_owner = current_user_id is not None and str(current_user_id) == str(entry.get('user_id'))
+
+                detail_col1, detail_col2 = st.columns(2)
+                with detail_col1:
+                    # Display plant name and privacy status
+                    title_col, status_col = st.columns([3, 1])
+                    with title_col:
+                        st.subheader(f"{entry['plant_name']}")
+                    with status_col:
+                        if pd.notna(entry['consent']) and entry['consent'] == 'No, keep private':
+                            st.warning("🔒 Private")
+                        else:
+                            st.success("🌍 Public")
+
+                    if pd.notna(entry['entry_title']):
+                        st.write(f"**Title:** {entry['entry_title']}")
+                    st.write(f"**Scientific Name:** {entry['scientific_name']}")
+                    st.write(f"**Categories:** {entry['category']}")
+                    st.write(f"**Local Names:** {entry['local_names']}")
+                    st.write(f"**Community:** {entry['community']}")
+                    st.write(f"**Location:** {entry['location']}")
+                    st.write(f"**Submitted By:** {entry['submitter_name'] if pd.notna(entry['submitter_name']) else 'Anonymous'}")
+                    st.write(f"**Date:** {entry['submission_time']}")
+
+                    with detail_col2:
+                        if pd.notna(entry['photo_path']) and os.path.exists(entry['photo_path']):
+                            st.image(
+                                previews.preview_for(entry['photo_path'], entry['photo_sha256'] if pd.notna(entry['photo_sha256']) else None),
+                                caption="Plant Photo"
+                            )
+                            # The full-size original is only sent when asked for
+                            if is_owner and st.checkbox("Show original photo", key=f"original_photo_{entry['id']}"):
+                                st.image(entry['photo_path'])
+
+                    st.subheader("Description")
+                    if pd.notna(entry.get('snippet')):
+                        st.markdown(f"**Search match:** {entry['snippet']}")
+                    st.write(f"**Usage:** {entry['usage_desc']}")
+                    st.write(f"**Preparation:** {entry['prep_method']}")
+
+                    # Display contributor information if available
+                    if pd.notna(entry['age_group']) or pd.notna(entry['submitter_role']):
+                        st.subheader("Contributor Information")
+                        if pd.notna(entry['age_group']):
+                            st.write(f"**Age Group:** {entry['age_group']}")
+                        if pd.notna(entry['submitter_role']):
+                            st.write(f"**Role:** {entry['submitter_role']}")
+                        if pd.notna(entry['submitter_name']) and entry['submitter_name'] != entry['submitter_name']:
+                            st.write(f"**Name:** {entry['submitter_name']}")
+                        # Contact info is only displayed to the owner of the submission
+                        current_user_id = st.session_state.user_info['id'] if 'user_info' in st.session_state else None
+
+                        # Show privacy status and contact info if authorized
+                        if pd.notna(entry['consent']):
+                            st.write(f"**Consent:** {entry['consent']}")
+
+                        # Only show contact info to the owner of the submission
+                        if current_user_id and str(current_user_id) == str(entry.get('user_id')):
+                            if pd.notna(entry['contact_info']):
+                                st.write(f"**Contact:** {entry['contact_info']}")
+
+                    # Display other media if available
+                    st.subheader("Attachments")
+                    # Let owners know when background processing is still running or failed
+                    if st.session_state.user_info and str(st.session_state.user_info['id']) == str(entry.get('user_id')):
+                        pending_jobs = [
+                            (kind, status) for kind, status, _ in jobs.submission_status(entry['id'])
+                            if status != 'done'
+                        ]
+                        if pending_jobs:
+                            st.info("Processing: " + ", ".join(f"{kind} ({status})" for kind, status in pending_jobs))
+                    if pd.notna(entry['voice_path']) and os.path.exists(entry['voice_path']):
+                        st.write("**Voice Recording:**")
+                        st.audio(entry['voice_path'], format=audio.mime_type(entry['voice_path']))
+                        voice_info = (
+                            audio.metadata(entry['voice_sha256']) if pd.notna(entry['voice_sha256']) else None
+                        )
+                        if voice_info:
+                            minutes, seconds = divmod(round(voice_info['duration']), 60)
+                            st.caption(
+                                f"{minutes}:{seconds:02d}"
+                                + (f" · {voice_info['bitrate'] // 1000} kbps" if voice_info['bitrate'] else "")
+                            )
+                            if voice_info['waveform']:
+                                st.area_chart(pd.DataFrame({'level': voice_info['waveform']}), height=80)
+
+                    if pd.notna(entry['notes_path']) and os.path.exists(entry['notes_path']):
+                        if entry['notes_path'].endswith('.pdf'):
+                            st.write(f"[View PDF Notes]({entry['notes_path']})")
+                        else:
+                            st.image(
+                                previews.preview_for(entry['notes_path'], entry['notes_sha256'] if pd.notna(entry['notes_sha256']) else None),
+                                caption="Scanned Notes"
+                            )
+                            if is_owner and st.checkbox("Show original scan", key=f"original_notes_{entry['id']}"):
+                                st.image(entry['notes_path'])
+
+        # Map of the filtered submissions around a place. Only the points inside
+        # the area shown are read, through the spatial index. Without a place,
+        # all public submissions are shown as precomputed grid clusters.
+        st.subheader("📍 Map")
+        map_col1, map_col2 = st.columns([2, 1])
+        with map_col1:
+            map_place = st.text_input("Centre the map on a place", key="map_place")
+        with map_col2:
+            map_radius = st.slider("Radius (km)", 5, 500, 50, step=5, key="map_radius")
+        if not map_place:
+            st.session_state.pop('map_lookup', None)
+        map_location = map_centre(map_place) if map_place else None
+        if map_place and map_location is None:
+            st.info(f"Looking up '{map_place}'...")
+        elif map_place:
+            map_lat, map_lon = map_location
+            if map_lat is None:
+                st.warning(f"Could not find '{map_place}'.")
+            else:
+                view = spatial.bbox_around(map_lat, map_lon, map_radius)
+                points, points_total = session.cached(
+                    ('map', browse_query.key(), view),
+                    lambda: spatial.points_in_view(browse_query, *view)
+                )
+                area_clusters = None
+                if points_total > len(points) and not browse_query.filtered():
+                    # Too many to show one by one: group the area's public
+                    # submissions at the finest zoom level that fits
+                    _, area_clusters = session.cached(
+                        ('clusters', view), lambda: spatial.clusters_in_view(*view)
+                    )
+                if area_clusters:
+                    cluster_df = draw_clusters(area_clusters)
+                    st.caption(
+                        f"{points_total} submissions in this area; the public ones are shown "
+                        f"grouped into {len(cluster_df)} areas"
+                    )
+                elif points:
+                    st.map(pd.DataFrame(points).rename(columns={'latitude': 'lat', 'longitude': 'lon'}))
+                    st.caption(
+                        f"{points_total} submissions in this area"
+                        + (f"; showing the newest {len(points)}" if points_total > len(points) else "")
+                    )
+                if points:
+                    closest = session.cached(
+                        ('nearby', browse_query.key(), map_lat, map_lon, map_radius),
+                        lambda: spatial.nearby(browse_query, map_lat, map_lon, map_radius, limit=10)
+                    )
+                    if closest:
+                        st.write(f"Closest to {map_place}:")
+                        st.dataframe(pd.DataFrame([
+                            {'ID': row['id'], 'Plant Name': row['plant_name'], 'Location': row['location'],
+                             'Distance (km)': round(row['distance_km'], 1)}
+                            for row in closest
+                        ]))
+                else:
+                    st.info(f"No submissions within {map_radius} km of {map_place}.")
+        else:
+            cluster_zoom, map_clusters = session.cached(('clusters',), spatial.clusters_in_view)
+            if map_clusters:
+                cluster_df = draw_clusters(map_clusters)
+                st.caption(
+                    f"{int(cluster_df['count'].sum())} public submissions in {len(cluster_df)} areas. "
+                    "Enter a place to see individual submissions matching the filters."
+                )
+
+        # Export of every submission matching the filters, built only when asked for
+        st.subheader("⬇️ Download")
+        export_col1, export_col2 = st.columns([1, 3])
+        with export_col1:
+            export_format = st.selectbox("Format", export.available_formats())
+        with export_col2:
+            extension, mime = export.FORMATS[export_format]
+            export_data = None
+            if DEFERRED_DOWNLOADS:
+                export_data = export_builder(browse_query, export_format)
+            else:
+                # Older Streamlit needs the data up front: build it on request
+                # and keep it until the filters or format change
+                export_key = (browse_query.key(), export_format)
+                prepared = st.session_state.get('export_prepared')
+                if prepared and prepared[0] == export_key:
+                    export_data = prepared[1]
+                elif st.button("Prepare download"):
+                    with st.spinner("Preparing export..."):
+                        export_data = export_builder(browse_query, export_format)()
+                    st.session_state.export_prepared = (export_key, export_data)
+            if export_data is not None:
+                st.download_button(
+                    f"Download {export_format} File",
+                    data=export_data,
+                    file_name=f"plantspeak_filtered_data.{extension}",
+                    mime=mime,
+                    key="export_download"
+                )
+
+    else:
+        st.info(
+            "No submissions in the database yet. Add your first plant knowledge entry using the "
+            f"'{get_text('add_entry', st.session_state.selected_language)}' tab."
+        )
+
+        # Try to import existing CSV data if available
+        if os.path.exists("plantspeak_submissions.csv"):
+            st.info("Legacy CSV data found. Would you like to import it to the database?")
+            if st.button("Import CSV Data to Database"):
+                import_progress = st.progress(0.0, text="Importing data...")
+                try:
+                    result = importer.import_csv(
+                        "plantspeak_submissions.csv",
+                        progress=lambda r: import_progress.progress(
+                            r.progress, text=f"Imported {r.inserted} of {r.read} rows read..."
+                        )
+                    )
+                    cache.invalidate()
+                    st.success(f"Successfully imported {result.inserted} submissions from CSV to the database!")
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Error importing data: {e}")
@@ -0,0 +1,40 @@
+"""Debug panel in the sidebar, shown when running with PLANTSPEAK_DEBUG=1."""
+import streamlit as st
+
+from plantspeak import geo, http_client, i18n, jobs
+
+
+def render():
+    """Query cache, geocoding, job queue, run, HTTP and translation counters"""
+    with st.sidebar.expander("🛠 Debug"):
+        cache_stats = st.session_state.query_cache.stats()
+        st.write(f"**Cache hits:** {cache_stats['hits']}")
+        st.write(f"**Cache misses:** {cache_stats['misses']}")
+        st.write(f"**Hit rate:** {cache_stats['hit_rate']:.0%}")
+        st.write(f"**Cached results:** {cache_stats['entries']}")
+        geo_stats = geo.cache_stats()
+        st.write(f"**Geocoding cache hit rate:** {geo_stats['hit_rate']:.0%} "
+                 f"({geo_stats.get('hits', 0)} hits, {geo_stats.get('misses', 0)} misses)")
+        st.write(f"**Geocoding coalesced / throttled:** "
+                 f"{geo_stats.get('coalesced', 0)} / {geo_stats.get('throttled', 0)}")
+        queue = jobs.queue_stats()
+        st.write("**Job queue:** " + (", ".join(f"{n} {status}" for status, n in sorted(queue['depth'].items())) or "empty"))
+        if queue['oldest_queued_age'] is not None:
+            st.write(f"**Oldest queued job:** {queue['oldest_queued_age']:.0f} s")
+        if queue['latency_p50'] is not None:
+            st.write(f"**Job latency:** p50 {queue['latency_p50']:.1f} s, p95 {queue['latency_p95']:.1f} s "
+                     f"(running p50 {queue['run_time_p50']:.2f} s)")
+        # Full script runs and reruns of single Add Entry steps
+        for name, (runs, seconds) in st.session_state.get('run_stats', {}).items():
+            st.write(f"**Runs of {name}:** {runs}, mean {seconds / runs * 1000:.0f} ms")
+        if 'runs_per_submission' in st.session_state:
+            st.write("**Runs for the last submission:** " + ", ".join(
+                f"{runs} {name}" for name, runs in st.session_state.runs_per_submission.items()
+            ))
+        for endpoint, latency in http_client.stats().items():
+            mean = f"{latency['mean'] * 1000:.0f} ms" if latency['mean'] is not None else "-"
+            st.write(f"**{endpoint}:** {latency['requests']} requests, {latency['errors']} errors, "
+                     f"mean {mean}, p95 ≤ {latency['p95']} s, circuit {latency['circuit']}")
+        # Messages shown from a fallback language, or as their key
+        for lang, keys in i18n.missing_report().items():
+            st.write(f"**Untranslated in {lang}:** " + ", ".join(f"{key} ({n})" for key, n in sorted(keys.items())))
@@ -0,0 +1,102 @@
+"""Sign-in and registration, shown until the user is logged in."""
+import re
+
+import streamlit as st
+
+from plantspeak import session, users
+from plantspeak.i18n import LANGUAGE_OPTIONS, get_text
+
+
+def render():
+    """Language choice and the sign-in and registration tabs"""
+    # Language selection at the top
+    st.header("🌍 " + get_text('select_language', st.session_state.selected_language))
+
+    # Create columns for language selection
+    lang_cols = st.columns(len(LANGUAGE_OPTIONS))
+
+    for i, lang in enumerate(LANGUAGE_OPTIONS):
+        with lang_cols[i]:
+            if st.button(lang, key=f"lang_{lang}"):
+                st.session_state.selected_language = lang
+                st.rerun()
+
+    # Display current language selection
+    st.info(f"Selected Language / चुनी गई भाषा / ఎంచుకున్న భాష: **{st.session_state.selected_language}**")
+
+    # Choose between login and registration with translated text
+    login_tab, register_tab = st.tabs([
+        f"🔑 {get_text('login', st.session_state.selected_language)}", 
+        f"📝 {get_text('register', st.session_state.selected_language)}"
+    ])
+
+    with login_tab:
+        st.header(get_text('login_header', st.session_state.selected_language))
+
+        login_username = st.text_input(
+            get_text('username', st.session_state.selected_language), 
+            key="login_username"
+        )
+        login_password = st.text_input(
+            get_text('password', st.session_state.selected_language), 
+            type="password", 
+            key="login_password"
+        )
+
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            login_button = st.button(get_text('login_button', st.session_state.selected_language))
+
+        if login_button:
+            if users.authenticate_user(login_username, login_password):
+                session.login_user(login_username)
+                st.session_state.page = 'main'
+                st.success(f"{get_text('welcome', st.session_state.selected_language)}, {login_username}!")
+                st.rerun()
+            else:
+                st.error(get_text('invalid_credentials', st.session_state.selected_language))
+
+    with register_tab:
+        st.header(get_text('register_header', st.session_state.selected_language))
+
+        reg_username = st.text_input(
+            get_text('username', st.session_state.selected_language) + " (required)", 
+            key="reg_username"
+        )
+        reg_password = st.text_input(
+            get_text('password', st.session_state.selected_language) + " (required)", 
+            type="password", 
+            key="reg_password"
+        )
+        reg_password_confirm = st.text_input(
+            get_text('confirm_password', st.session_state.selected_language), 
+            type="password", 
+            key="reg_password_confirm"
+        )
+
+        reg_name = st.text_input(get_text('full_name', st.session_state.selected_language), key="reg_name")
+        reg_email = st.text_input(get_text('email', st.session_state.selected_language), key="reg_email")
+        reg_role = st.text_input(get_text('role', st.session_state.selected_language), key="reg_role")
+        reg_community = st.text_input(get_text('community', st.session_state.selected_language), key="reg_community")
+
+        register_button = st.button(get_text('register_button', st.session_state.selected_language))
+
+        if register_button:
+            # Basic validation with translated error messages
+            if not reg_username or not reg_password:
+                st.error(get_text('username_required', st.session_state.selected_language))
+            elif reg_password != reg_password_confirm:
+                st.error(get_text('passwords_not_match', st.session_state.selected_language))
+            elif len(reg_password) < 6:
+                st.error(get_text('password_too_short', st.session_state.selected_language))
+            elif reg_email and not re.match(r"[^@]+@[^@]+\.[^@]+", reg_email):
+                st.error("Please enter a valid email address")  # Keep in English as it's technical
+            else:
+                if users.add_user(reg_username, reg_password, reg_name, reg_email, reg_role, reg_community):
+                    st.success(get_text('registration_successful', st.session_state.selected_language))
+                    # Auto-login after registration
+                    session.login_user(reg_username)
+                    st.session_state.page = 'main'
+                    st.rerun()
+                else:
+                    st.error(get_text('username_exists', st.session_state.selected_language))
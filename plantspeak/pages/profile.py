@@ -0,0 +1,96 @@
+"""The My Profile page: account details, contribution statistics and profile updates."""
+import re
+
+import pandas as pd
+import streamlit as st
+
+from plantspeak import session, submissions, users
+from plantspeak.i18n import get_text
+
+
+def render():
+    """Account details, statistics and the profile update form"""
+    st.title(get_text('my_profile', st.session_state.selected_language))
+
+    user_info = st.session_state.user_info
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.subheader("Account Information")
+        st.write(f"**Username:** {user_info['username']}")
+        st.write(f"**Name:** {user_info['name'] or 'Not provided'}")
+        st.write(f"**Email:** {user_info['email'] or 'Not provided'}")
+        st.write(f"**Role:** {user_info['role'] or 'Not specified'}")
+        st.write(f"**Community:** {user_info['community'] or 'Not specified'}")
+
+    with col2:
+        st.subheader("Statistics")
+
+        # Aggregates over the user's own submissions only
+        stats = session.cached(('stats', user_info['id']), lambda: submissions.contributor_stats(user_info['id']))
+        st.write(f"**Your contributions:** {stats['total']} ({stats['public']} public)")
+
+        if stats['total']:
+            st.write(
+                f"**Media:** {stats['with_photo']} with photos, {stats['with_voice']} with voice recordings, "
+                f"{stats['with_notes']} with notes, {stats['with_coordinates']} with coordinates"
+            )
+            if stats['by_category']:
+                st.write("**By category:** " + ", ".join(f"{cat} ({n})" for cat, n in stats['by_category']))
+            if stats['by_language']:
+                st.write("**Languages:** " + ", ".join(f"{lang} ({n})" for lang, n in stats['by_language']))
+            if stats['by_month']:
+                st.write("**Contributions per month:**")
+                st.bar_chart(pd.DataFrame(stats['by_month'], columns=['Month', 'Contributions']).set_index('Month'))
+
+    # Profile update form
+    st.subheader("Update Profile")
+
+    with st.form("profile_update_form"):
+        update_name = st.text_input("Full Name", value=user_info['name'] or "")
+        update_email = st.text_input("Email", value=user_info['email'] or "")
+        update_role = st.text_input("Role (e.g., Farmer, Healer, Researcher)", value=user_info['role'] or "")
+        update_community = st.text_input("Community or Organization", value=user_info['community'] or "")
+
+        # Password change section
+        st.subheader("Change Password (Optional)")
+        update_password = st.text_input("New Password", type="password")
+        confirm_password = st.text_input("Confirm New Password", type="password")
+
+        submit_button = st.form_submit_button("Update Profile")
+
+    if submit_button:
+        # Validate input
+        if update_email and not re.match(r"[^@]+@[^@]+\.[^@]+", update_email):
+            st.error("Please enter a valid email address")
+        elif update_password and len(update_password) < 6:
+            st.error("Password must be at least 6 characters long")
+        elif update_password and update_password != confirm_password:
+            st.error("Passwords do not match")
+        else:
+            # Only update password if a new one was provided
+            password_to_update = update_password if update_password else None
+
+            # Update profile in database
+            if users.update_user_profile(
+                user_info['id'], 
+                name=update_name, 
+                email=update_email, 
+                role=update_role, 
+                community=update_community,
+                password=password_to_update
+            ):
+                st.success("Profile updated successfully!")
+
+                # Update the session state with new information
+                user_info['name'] = update_name
+                user_info['email'] = update_email
+                user_info['role'] = update_role
+                user_info['community'] = update_community
+                st.session_state.user_info = user_info
+
+                # Refresh the page to show the updated information
+                st.rerun()
+            else:
+                st.error("Failed to update profile. The email may already be in use.")
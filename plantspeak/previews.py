@@ -0,0 +1,153 @@
+"""Downscaled copies of uploaded photos and note scans.
+
+Phone photos are often 5-12 MB, too large to send to the browser every
+time a submission is viewed. Each stored image gets a small thumbnail and a
+medium preview, written as WebP (JPEG if Pillow was built without WebP) next
+to the media store and named after the original's hash. Derivatives are
+re-encoded from the pixels only, so EXIF data such as GPS position and
+camera details is not carried over; the original is only shown to the
+contributor.
+
+Images stored before derivatives existed can be processed with:
+    python -m plantspeak.previews [--db plantspeak.db]
+"""
+import argparse
+import io
+import os
+import tempfile
+
+from PIL import Image, ImageOps, features
+
+from plantspeak import db, media
+
+# Longest side, in pixels, of each derivative
+SIZES = {
+    'thumb': 256,
+    'preview': 1024,
+}
+FORMAT, EXTENSION = ('WEBP', '.webp') if features.check('webp') else ('JPEG', '.jpg')
+QUALITY = 80
+
+DERIVED_ROOT = os.path.join(media.MEDIA_ROOT, 'derived')
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp', '.tif', '.tiff')
+
+
+def is_image(path):
+    """Whether a stored file is an image derivatives can be made from"""
+    return os.path.splitext(path or '')[1].lower() in IMAGE_EXTENSIONS
+
+
+def derivative_path(sha256, size):
+    return os.path.join(DERIVED_ROOT, sha256[:2], sha256[2:4], f"{sha256}-{size}{EXTENSION}")
+
+
+def render(f, size):
+    """Return the derivative of image file (path or file object) f as bytes"""
+    max_side = SIZES[size]
+    with Image.open(f) as image:
+        # Let the JPEG decoder scale down while decoding, which is much
+        # faster and lighter than decoding the full image
+        image.draft('RGB', (max_side, max_side))
+        # Apply the EXIF orientation before the EXIF data is dropped
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            has_alpha = image.mode in ('LA', 'PA') or 'transparency' in image.info
+            image = image.convert('RGBA' if has_alpha else 'RGB')
+        if FORMAT == 'JPEG' and image.mode == 'RGBA':
+            image = image.convert('RGB')
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+
+        out = io.BytesIO()
+        if FORMAT == 'WEBP':
+            image.save(out, FORMAT, quality=QUALITY, method=4)
+        else:
+            image.save(out, FORMAT, quality=QUALITY, optimize=True)
+    return out.getvalue()
+
+
+def generate(sha256, source_path):
+    """Write any missing derivatives of a stored image; return {size: path}"""
+    paths = {}
+    for size in SIZES:
+        path = derivative_path(sha256, size)
+        if not os.path.exists(path):
+            data = render(source_path, size)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.derived-')
+            try:
+                with os.fdopen(fd, 'wb') as out:
+                    out.write(data)
+                os.replace(temp_path, path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        paths[size] = path
+    return paths
+
+
+def preview_for(original_path, sha256, size='preview'):
+    """
+    Path of the derivative to show for an image, made on first use if missing.
+    Files stored before content hashing have no derivatives until the backfill
+    has been run, so their original is returned.
+    """
+    if not sha256 or not is_image(original_path):
+        return original_path
+    path = derivative_path(sha256, size)
+    if not os.path.exists(path):
+        try:
+            generate(sha256, original_path)
+        except (OSError, Image.DecompressionBombError) as e:
+            print(f"Could not make {size} of {original_path}: {e}")
+            return original_path
+    return path
+
+
+def backfill(path=None):
+    """
+    Move images uploaded before the media store into it and make their
+    derivatives. Returns (images processed, images that could not be read).
+    """
+    done = failed = 0
+    for column in ('photo', 'notes'):
+        with db.connection(path) as conn:
+            rows = conn.execute(f'''
+                SELECT id, {column}_path AS file_path, {column}_sha256 AS sha256
+                FROM submissions
+                WHERE COALESCE({column}_path, '') != ''
+            ''').fetchall()
+
+        for row in rows:
+            if not is_image(row['file_path']) or not os.path.exists(row['file_path']):
+                continue
+            try:
+                sha256 = row['sha256']
+                if not sha256:
+                    with open(row['file_path'], 'rb') as f:
+                        stored = media.store(f, row['file_path'], path=path)
+                    sha256 = stored.sha256
+                    with db.transaction(path) as conn:
+                        conn.execute(
+                            f'UPDATE submissions SET {column}_sha256 = ? WHERE id = ?', (sha256, row['id'])
+                        )
+                generate(sha256, row['file_path'])
+                done += 1
+            except (OSError, Image.DecompressionBombError) as e:
+                print(f"Skipping {row['file_path']}: {e}")
+                failed += 1
+    return done, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Make previews of images uploaded before they existed")
+    parser.add_argument('--db', default=db.DB_PATH, help="SQLite database (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    db.migrate(args.db)
+    done, failed = backfill(args.db)
+    print(f"Done: {done} images processed, {failed} could not be read")
+    db.close_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""Per-session state shared by the pages: sign-in, the query cache and run counts."""
+import streamlit as st
+
+from plantspeak import cache, users
+
+
+def cached(key, compute):
+    """Memoise a database read in this session's query cache"""
+    if 'query_cache' not in st.session_state:
+        st.session_state.query_cache = cache.QueryCache()
+    return st.session_state.query_cache.get(key, compute)
+
+
+def check_login_status():
+    """Check if a user is logged in"""
+    if 'logged_in' not in st.session_state:
+        st.session_state.logged_in = False
+        st.session_state.username = None
+        st.session_state.user_info = None
+
+    return st.session_state.logged_in
+
+
+def login_user(username):
+    """Set session state for logged in user"""
+    st.session_state.logged_in = True
+    st.session_state.username = username
+    st.session_state.user_info = users.get_user_info(username)
+
+
+def logout_user():
+    """Clear session state for logout"""
+    st.session_state.logged_in = False
+    st.session_state.username = None
+    st.session_state.user_info = None
+
+
+def record_run(name, seconds):
+    """Count a run of the script or of one of its fragments, shown in the debug panel"""
+    run_stats = st.session_state.setdefault('run_stats', {})
+    runs, total = run_stats.get(name, (0, 0.0))
+    run_stats[name] = (runs + 1, total + seconds)
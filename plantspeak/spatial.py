@@ -0,0 +1,174 @@
+"""Queries on where submissions were recorded.
+
+Coordinates are indexed in the submissions_rtree R*Tree, so a box query
+reads only the index entries inside the box instead of scanning every
+submission. Radius queries search the box around the circle and then keep
+the points whose great-circle distance is within the radius; the R*Tree
+stores 32-bit floats rounded outwards, so this also trims the few points
+the index lets through at the edges.
+
+For maps of many submissions, public submissions are also counted per grid
+cell at each zoom level in map_clusters (kept up to date by triggers), so a
+map of the whole archive, or of a crowded area, is drawn from a few hundred
+cell markers at the finest level that fits.
+"""
+import math
+
+from plantspeak import db, geo
+
+KM_PER_DEGREE_LAT = math.pi * geo.EARTH_RADIUS_KM / 180
+# Most points sent to the map at once
+MAP_POINT_LIMIT = 5000
+# Most cluster markers sent to the map at once
+MAP_CLUSTER_LIMIT = 300
+
+_POINT_COLUMNS = 's.id, s.plant_name, s.location, s.latitude, s.longitude, s.submission_time'
+
+
+def _box_condition(south, west, north, east):
+    """WHERE clause and params on submissions_rtree (aliased r) for a box"""
+    condition = 'r.min_lat <= ? AND r.max_lat >= ?'
+    if west <= east:
+        return f'{condition} AND r.min_lon <= ? AND r.max_lon >= ?', [north, south, east, west]
+    # The box crosses the antimeridian
+    return f'{condition} AND (r.min_lon <= ? OR r.max_lon >= ?)', [north, south, east, west]
+
+
+def _in_box(query, columns, box):
+    """
+    SQL and params selecting columns of the submissions matched by query
+    inside box. The R*Tree drives the query, so the visibility branches are
+    OR-ed together as for full-text searches; CROSS JOIN keeps SQLite from
+    walking the submission_time index instead.
+    """
+    branches = query.branches()
+    where = ' OR '.join(f'({w})' for w, _ in branches)
+    params = [p for _, branch_params in branches for p in branch_params]
+    box_where, box_params = _box_condition(*box)
+    sql = f'''
+        SELECT {columns}
+        FROM submissions_rtree r
+        CROSS JOIN submissions s ON s.rowid = r.id
+        WHERE {box_where} AND ({where})
+    '''
+    return sql, [*box_params, *params]
+
+
+def bbox_around(lat, lon, radius_km):
+    """(south, west, north, east) of a box containing the circle around a point"""
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    south, north = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+    if south == -90.0 or north == 90.0:
+        # The circle reaches a pole, so it covers every longitude
+        return south, -180.0, north, 180.0
+    # Longitude degrees shrink towards the poles; use the widest latitude
+    widest = max(abs(south), abs(north))
+    dlon = radius_km / (KM_PER_DEGREE_LAT * math.cos(math.radians(widest)))
+    if dlon >= 180:
+        return south, -180.0, north, 180.0
+    west = (lon - dlon + 180) % 360 - 180
+    east = (lon + dlon + 180) % 360 - 180
+    return south, west, north, east
+
+
+def points_in_view(query, south, west, north, east, limit=MAP_POINT_LIMIT):
+    """
+    The located submissions matched by query inside a map viewport, as dicts
+    with id, plant_name, location, latitude, longitude and submission_time;
+    at most limit, newest first. Returns (points, total in the viewport).
+    """
+    box = (south, west, north, east)
+    sql, params = _in_box(query, _POINT_COLUMNS, box)
+    count_sql, count_params = _in_box(query, 'COUNT(*)', box)
+    with db.connection() as conn:
+        points = [dict(row) for row in conn.execute(
+            sql + ' ORDER BY s.submission_time DESC LIMIT ?', [*params, limit]
+        )]
+        total = len(points) if len(points) < limit else conn.execute(count_sql, count_params).fetchone()[0]
+    return points, total
+
+
+def nearby(query, lat, lon, radius_km, limit=None):
+    """
+    The located submissions matched by query within radius_km of a point,
+    nearest first, each with a distance_km. Returns all of them unless
+    limit is given.
+    """
+    sql, params = _in_box(query, 's.*', bbox_around(lat, lon, radius_km))
+    rows = []
+    with db.connection() as conn:
+        for row in conn.execute(sql, params):
+            distance = geo.haversine_km(lat, lon, row['latitude'], row['longitude'])
+            if distance <= radius_km:
+                row = dict(row)
+                row['distance_km'] = distance
+                rows.append(row)
+    rows.sort(key=lambda row: row['distance_km'])
+    return rows[:limit] if limit is not None else rows
+
+
+def _cell_condition(zoom, cell_size, south, west, north, east):
+    """WHERE clause and params on map_clusters for the cells of a zoom level inside a box"""
+    def cell(degrees, offset):
+        return int((degrees + offset) // cell_size)
+
+    condition = 'zoom = ? AND cell_lat BETWEEN ? AND ?'
+    params = [zoom, cell(south, 90), cell(north, 90), cell(west, 180), cell(east, 180)]
+    if west <= east:
+        return f'{condition} AND cell_lon BETWEEN ? AND ?', params
+    return f'{condition} AND (cell_lon >= ? OR cell_lon <= ?)', params
+
+
+def clusters_in_view(south=-90.0, west=-180.0, north=90.0, east=180.0, limit=MAP_CLUSTER_LIMIT):
+    """
+    Public submissions inside a box, grouped into grid cells at the finest
+    zoom level that needs no more than limit markers (the coarsest level if
+    none does). Returns (zoom, clusters), each cluster a dict with the mean
+    latitude and longitude of its submissions and their count.
+    """
+    with db.connection() as conn:
+        levels = conn.execute('SELECT zoom, cell_size FROM map_cluster_levels ORDER BY zoom').fetchall()
+        chosen = levels[0]
+        for level in levels:
+            where, params = _cell_condition(level['zoom'], level['cell_size'], south, west, north, east)
+            # Count no further than needed to know the level is too fine
+            cells = conn.execute(
+                f'SELECT COUNT(*) FROM (SELECT 1 FROM map_clusters WHERE {where} LIMIT ?)', [*params, limit + 1]
+            ).fetchone()[0]
+            if cells > limit:
+                break
+            chosen = level
+
+        where, params = _cell_condition(chosen['zoom'], chosen['cell_size'], south, west, north, east)
+        clusters = [dict(row) for row in conn.execute(f'''
+            SELECT sum_lat / count AS latitude, sum_lon / count AS longitude, count
+            FROM map_clusters WHERE {where}
+        ''', params)]
+    return chosen['zoom'], clusters
+
+
+def rebuild_spatial_index():
+    """
+    Rebuild submissions_rtree and map_clusters from the submissions table.
+    Like the search index the R*Tree refers to rowids, so run this after
+    vacuuming the database.
+    """
+    located = 'latitude IS NOT NULL AND longitude IS NOT NULL AND (latitude != 0 OR longitude != 0)'
+    with db.transaction() as conn:
+        conn.execute('DELETE FROM submissions_rtree')
+        conn.execute(f'''
+            INSERT INTO submissions_rtree
+            SELECT rowid, latitude, latitude, longitude, longitude FROM submissions
+            WHERE {located}
+        ''')
+        conn.execute('DELETE FROM map_clusters')
+        conn.execute(f'''
+            INSERT INTO map_clusters (zoom, cell_lat, cell_lon, count, sum_lat, sum_lon)
+            SELECT level.zoom,
+                   CAST((latitude + 90) / level.cell_size AS INTEGER),
+                   CAST((longitude + 180) / level.cell_size AS INTEGER),
+                   COUNT(*), SUM(latitude), SUM(longitude)
+            FROM submissions CROSS JOIN map_cluster_levels AS level
+            WHERE is_public AND {located}
+            GROUP BY 1, 2, 3
+        ''')
@@ -0,0 +1,345 @@
+"""Queries behind the View Submissions tab.
+
+Submissions are read one page at a time using keyset pagination on
+(submission_time, id), so the cost of a page does not depend on how deep
+into the archive it is or on how large the archive has grown. Filters are
+applied by the database through SubmissionQuery. Text searches go through
+the submissions_fts full-text index and are ranked by relevance instead.
+"""
+from plantspeak import db
+
+# Page sizes offered in the browse tab
+PAGE_SIZES = [10, 25, 50, 100]
+DEFAULT_PAGE_SIZE = 25
+
+_SELECT = '''
+    SELECT s.*, u.username, u.name as submitter_name
+    FROM submissions s
+    LEFT JOIN users u ON s.user_id = u.id
+'''
+
+# bm25 weight of each column in db.SEARCH_COLUMNS: a hit on a name counts
+# for more than one buried in a long usage description
+SEARCH_WEIGHTS = {
+    'plant_name': 10.0,
+    'entry_title': 4.0,
+    'local_names': 8.0,
+    'scientific_name': 8.0,
+    'usage_desc': 2.0,
+    'prep_method': 1.0,
+    'tags': 5.0,
+    'community': 2.0,
+    'location': 3.0,
+}
+
+
+def split_categories(category):
+    """Split the ", "-joined category column into a list"""
+    return [cat for cat in (category or '').split(', ') if cat]
+
+
+def normalise_tag(tag):
+    """Canonical form of a free-form tag, so "Fever " and "fever" are one tag"""
+    return ' '.join(tag.split()).lower()
+
+
+def split_tags(tags):
+    """Split the comma-separated tags column into a list of normalised tags"""
+    return [tag for tag in (normalise_tag(t) for t in (tags or '').split(',')) if tag]
+
+
+def save_terms(conn, submission_id, category, tags):
+    """
+    Record a submission's categories and tags in the lookup tables.
+    Call this inside the transaction that inserts the submission.
+    """
+    conn.executemany(
+        'INSERT OR IGNORE INTO submission_categories (category, submission_id) VALUES (?, ?)',
+        [(cat, submission_id) for cat in split_categories(category)]
+    )
+    conn.executemany(
+        'INSERT OR IGNORE INTO submission_tags (tag, submission_id) VALUES (?, ?)',
+        [(tag, submission_id) for tag in split_tags(tags)]
+    )
+
+
+def match_expression(text):
+    """
+    Turn free text typed by a user into an FTS5 query.
+    Every word must match; the last one also matches as a prefix so results
+    appear while the user is still typing. Returns None if there are no words.
+    """
+    words = text.split()
+    if not words:
+        return None
+    # Quote each word so FTS5 operators and punctuation are taken literally
+    phrases = ['"' + word.replace('"', '""') + '"' for word in words]
+    phrases[-1] += '*'
+    return ' '.join(phrases)
+
+
+class SubmissionQuery:
+    """Parameterised filters for the submissions a user is allowed to see.
+
+    Visibility is expressed as separate WHERE branches (own rows, public rows
+    from others), each matched by its own index, which are combined with
+    UNION ALL rather than OR-ed together. Filters are added to every branch.
+    """
+
+    def __init__(self, user_id=None):
+        self.user_id = user_id
+        self.only_own = False
+        self.text = None
+        self.conditions = []
+        self.params = []
+
+    def where(self, condition, *params):
+        """Add a raw SQL condition on the submissions table (aliased s)"""
+        self.conditions.append(condition)
+        self.params.extend(params)
+        return self
+
+    def category(self, category):
+        """Only match submissions in this category"""
+        return self.where(
+            's.id IN (SELECT submission_id FROM submission_categories WHERE category = ?)', category
+        )
+
+    def tag(self, tag):
+        """Only match submissions with this tag"""
+        return self.where(
+            's.id IN (SELECT submission_id FROM submission_tags WHERE tag = ?)', normalise_tag(tag)
+        )
+
+    def search(self, text):
+        """Full-text search over names, uses, preparation, tags and places"""
+        self.text = match_expression(text)
+        return self
+
+    def mine(self):
+        """Only match the user's own submissions"""
+        self.only_own = True
+        return self
+
+    def key(self):
+        """A hashable summary of the query, for caching its results"""
+        return (self.user_id, self.only_own, self.text, tuple(self.conditions), tuple(self.params))
+
+    def filtered(self):
+        """Whether anything narrows the query beyond what the user may see"""
+        return bool(self.only_own or self.text or self.conditions)
+
+    def branches(self, full_text=True):
+        """
+        Return the (WHERE clause, params) of each UNION ALL branch.
+        With full_text=False the search text is left out, for queries that
+        join the full-text index themselves.
+        """
+        if self.user_id:
+            visibility = [('s.user_id = ?', [self.user_id])]
+            if not self.only_own:
+                visibility.append(('s.is_public = 1 AND s.user_id IS NOT ?', [self.user_id]))
+        else:
+            # Anonymous users only see public submissions
+            visibility = [('s.is_public = 1', [])]
+
+        conditions = list(self.conditions)
+        params = list(self.params)
+        if full_text and self.text:
+            conditions.append('s.rowid IN (SELECT rowid FROM submissions_fts WHERE submissions_fts MATCH ?)')
+            params.append(self.text)
+
+        branches = []
+        for clause, clause_params in visibility:
+            where = ' AND '.join(f'({c})' for c in [clause, *conditions])
+            branches.append((where, [*clause_params, *params]))
+        return branches
+
+
+def fetch_page(query, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Fetch one page of the submissions matched by query.
+    Returns (rows, next_cursor); pass next_cursor back in to get the following
+    page, or stop when it is None. The cursor is opaque to callers.
+    """
+    if query.text:
+        return _fetch_ranked_page(query, cursor or 0, page_size)
+    return _fetch_newest_page(query, cursor, page_size)
+
+
+def _newest_page_sql(query, cursor, page_size):
+    """
+    The (sql, params) of _fetch_newest_page, newest first, paginated on
+    (submission_time, id). cursor is the (submission_time, id) of the last
+    row on the previous page, or None for the first page.
+    """
+    selects = []
+    params = []
+    for where, branch_params in query.branches():
+        if cursor is not None:
+            where += ' AND (s.submission_time, s.id) < (?, ?)'
+            branch_params = [*branch_params, *cursor]
+        selects.append(f'{_SELECT} WHERE {where}')
+        params.extend(branch_params)
+
+    # Fetch one extra row to find out whether there is a next page
+    sql = ' UNION ALL '.join(selects) + ' ORDER BY submission_time DESC, id DESC LIMIT ?'
+    return sql, [*params, page_size + 1]
+
+
+def _fetch_newest_page(query, cursor, page_size):
+    """Newest first, paginated on (submission_time, id)"""
+    sql, params = _newest_page_sql(query, cursor, page_size)
+    with db.connection() as conn:
+        rows = conn.execute(sql, params).fetchall()
+
+    rows = [dict(row) for row in rows]
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = (rows[-1]['submission_time'], rows[-1]['id'])
+    return rows, next_cursor
+
+
+def _fetch_ranked_page(query, offset, page_size):
+    """
+    Best bm25 match first, with a highlighted snippet of the matching text.
+    The cursor is a row offset; relevance has no stable key to page on, but
+    search results are a small slice of the archive.
+    """
+    # The full-text index drives this query, so the visibility branches
+    # are simply OR-ed together
+    branches = query.branches(full_text=False)
+    where = ' OR '.join(f'({w})' for w, _ in branches)
+    params = [p for _, branch_params in branches for p in branch_params]
+    weights = ', '.join(str(SEARCH_WEIGHTS[c]) for c in db.SEARCH_COLUMNS)
+
+    sql = f'''
+        SELECT s.*, u.username, u.name as submitter_name,
+               snippet(submissions_fts, -1, '**', '**', '…', 12) AS snippet
+        FROM submissions_fts
+        JOIN submissions s ON s.rowid = submissions_fts.rowid
+        LEFT JOIN users u ON s.user_id = u.id
+        WHERE submissions_fts MATCH ? AND ({where})
+        ORDER BY bm25(submissions_fts, {weights})
+        LIMIT ? OFFSET ?
+    '''
+    with db.connection() as conn:
+        rows = conn.execute(sql, [query.text, *params, page_size + 1, offset]).fetchall()
+
+    rows = [dict(row) for row in rows]
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = offset + page_size
+    return rows, next_cursor
+
+
+def count(query):
+    """Count the submissions matched by query without loading them"""
+    counts = []
+    params = []
+    for where, branch_params in query.branches():
+        counts.append(f'(SELECT COUNT(*) FROM submissions s WHERE {where})')
+        params.extend(branch_params)
+    with db.connection() as conn:
+        return conn.execute('SELECT ' + ' + '.join(counts), params).fetchone()[0]
+
+
+def has_visible_submissions(user_id=None):
+    """Check whether the user can see at least one submission"""
+    rows, _ = fetch_page(SubmissionQuery(user_id), page_size=1)
+    return bool(rows)
+
+
+def facets(query):
+    """
+    Count the submissions matched by query per category, tag, language and
+    community, in a single query over the lookup tables.
+    Returns {facet: [(value, count), ...]}, most common value first.
+    """
+    selects = []
+    params = []
+    for where, branch_params in query.branches():
+        selects.append(f'SELECT s.id, s.language, s.community FROM submissions s WHERE {where}')
+        params.extend(branch_params)
+
+    sql = f'''
+        WITH matched AS ({' UNION ALL '.join(selects)})
+        SELECT 'category', c.category, COUNT(*) FROM matched m
+            JOIN submission_categories c ON c.submission_id = m.id GROUP BY c.category
+        UNION ALL
+        SELECT 'tag', t.tag, COUNT(*) FROM matched m
+            JOIN submission_tags t ON t.submission_id = m.id GROUP BY t.tag
+        UNION ALL
+        SELECT 'language', TRIM(m.language) COLLATE NOCASE, COUNT(*) FROM matched m
+            WHERE TRIM(m.language) != '' GROUP BY 2
+        UNION ALL
+        SELECT 'community', TRIM(m.community) COLLATE NOCASE, COUNT(*) FROM matched m
+            WHERE TRIM(m.community) != '' GROUP BY 2
+    '''
+    result = {'category': [], 'tag': [], 'language': [], 'community': []}
+    with db.connection() as conn:
+        for facet, value, n in conn.execute(sql, params):
+            result[facet].append((value, n))
+    for values in result.values():
+        values.sort(key=lambda item: (-item[1], item[0]))
+    return result
+
+
+def rebuild_search_index():
+    """
+    Rebuild the full-text index from the submissions table.
+    The index refers to submissions by rowid, which VACUUM may renumber,
+    so run this after vacuuming the database.
+    """
+    with db.transaction() as conn:
+        conn.execute("INSERT INTO submissions_fts (submissions_fts) VALUES ('rebuild')")
+
+
+def contributor_stats(user_id):
+    """
+    Summarise one user's own submissions for the profile page.
+    Every aggregate reads only the user's rows through the user_id indexes,
+    so the cost depends on how much they contributed, not on archive size.
+    """
+    with db.connection() as conn:
+        totals = conn.execute('''
+            SELECT COUNT(*) AS total,
+                   COALESCE(SUM(is_public), 0) AS public,
+                   COALESCE(SUM(COALESCE(photo_path, '') != ''), 0) AS with_photo,
+                   COALESCE(SUM(COALESCE(voice_path, '') != ''), 0) AS with_voice,
+                   COALESCE(SUM(COALESCE(notes_path, '') != ''), 0) AS with_notes,
+                   COALESCE(SUM(latitude != 0 AND longitude != 0), 0) AS with_coordinates
+            FROM submissions
+            WHERE user_id = ?
+        ''', (user_id,)).fetchone()
+        by_category = conn.execute('''
+            SELECT c.category, COUNT(*)
+            FROM submissions s
+            JOIN submission_categories c ON c.submission_id = s.id
+            WHERE s.user_id = ?
+            GROUP BY c.category
+            ORDER BY COUNT(*) DESC, c.category
+        ''', (user_id,)).fetchall()
+        by_month = conn.execute('''
+            SELECT substr(submission_time, 1, 7) AS month, COUNT(*)
+            FROM submissions
+            WHERE user_id = ?
+            GROUP BY month
+            ORDER BY month
+        ''', (user_id,)).fetchall()
+        by_language = conn.execute('''
+            SELECT TRIM(language) COLLATE NOCASE, COUNT(*)
+            FROM submissions
+            WHERE user_id = ? AND TRIM(language) != ''
+            GROUP BY 1
+            ORDER BY COUNT(*) DESC
+        ''', (user_id,)).fetchall()
+
+    return {
+        **dict(totals),
+        'by_category': [tuple(row) for row in by_category],
+        'by_month': [tuple(row) for row in by_month],
+        'by_language': [tuple(row) for row in by_language],
+    }
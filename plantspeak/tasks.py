@@ -0,0 +1,80 @@
+"""Background jobs run after a submission is saved (see plantspeak.jobs).
+
+Importing this module registers the handlers.
+"""
+from plantspeak import audio, cache, db, geo, jobs, journal, media, previews
+
+
+@jobs.handler('previews')
+def make_previews(sha256, path):
+    """Make the thumbnail and preview of a stored image"""
+    previews.generate(sha256, path)
+
+
+@jobs.handler('place_name')
+def fill_place_name(submission_id):
+    """Fill in a submission's blank location from its coordinates"""
+    with db.connection() as conn:
+        row = conn.execute(
+            'SELECT location, latitude, longitude FROM submissions WHERE id = ?', (submission_id,)
+        ).fetchone()
+    if row is None or (row['location'] or '').strip() or not (row['latitude'] and row['longitude']):
+        return
+
+    place_name = geo.reverse_geocode(row['latitude'], row['longitude'])
+    if not place_name:
+        return
+    with db.transaction() as conn:
+        # The search index is updated by the submissions triggers
+        conn.execute(
+            "UPDATE submissions SET location = ? WHERE id = ? AND TRIM(COALESCE(location, '')) = ''",
+            (place_name, submission_id)
+        )
+    cache.invalidate()
+    journal.record_submissions([submission_id])
+
+
+@jobs.handler('audio')
+def process_voice(submission_id, sha256):
+    """Store a compact copy of a voice recording and switch the submission to it"""
+    original = media.get(sha256)
+    if original is None:
+        return
+    compact = audio.process(original)
+    if compact.sha256 == original.sha256:
+        return
+
+    with db.transaction() as conn:
+        conn.execute(
+            'UPDATE submissions SET voice_path = ?, voice_sha256 = ? WHERE id = ? AND voice_sha256 = ?',
+            (compact.path, compact.sha256, submission_id, original.sha256)
+        )
+        # The original is deleted later if nothing uses it by then: an upload
+        # of the same recording may still be saving its submission
+        jobs.enqueue('prune_media', {'sha256': original.sha256}, conn=conn, delay=media.PRUNE_AGE)
+    cache.invalidate()
+    journal.record_submissions([submission_id])
+
+
+@jobs.handler('prune_media')
+def prune_media(sha256):
+    """Delete a stored file if no submission uses it any more"""
+    media.prune([sha256])
+
+
+def queue_submission_jobs(conn, submission_id, stored_media, has_coordinates, location):
+    """
+    Queue the background work for a new submission, inside the transaction
+    that saves it. stored_media maps 'photo'/'voice'/'notes' to StoredMedia.
+    """
+    for field in ('photo', 'notes'):
+        if field in stored_media and previews.is_image(stored_media[field].path):
+            jobs.enqueue(
+                'previews', {'sha256': stored_media[field].sha256, 'path': stored_media[field].path},
+                submission_id, conn=conn
+            )
+    if 'voice' in stored_media:
+        jobs.enqueue('audio', {'submission_id': submission_id, 'sha256': stored_media['voice'].sha256},
+                     submission_id, conn=conn)
+    if has_coordinates and not (location or '').strip():
+        jobs.enqueue('place_name', {'submission_id': submission_id}, submission_id, conn=conn)
@@ -0,0 +1,113 @@
+"""User accounts: registration, sign-in and profile updates."""
+import hashlib
+import sqlite3
+
+from plantspeak import db
+
+
+def hash_password(password):
+    """Convert password to secure hash"""
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+def verify_password(stored_password, provided_password):
+    """Verify the provided password against stored hash"""
+    return stored_password == hash_password(provided_password)
+
+
+def add_user(username, password, name='', email='', role='', community=''):
+    """Add a new user to the database"""
+    hashed_pw = hash_password(password)
+
+    try:
+        with db.transaction() as conn:
+            conn.execute(
+                "INSERT INTO users (username, password, name, email, role, community) VALUES (?, ?, ?, ?, ?, ?)",
+                (username, hashed_pw, name, email, role, community)
+            )
+        return True
+    except sqlite3.IntegrityError:
+        # Handle duplicate username/email
+        return False
+    except sqlite3.OperationalError as e:
+        # Handle locked database
+        print(f"Database error: {e}")
+        return False
+    except Exception as e:
+        # Handle any other errors
+        print(f"Unexpected error: {e}")
+        return False
+
+
+def authenticate_user(username, password):
+    """Check if username and password match a user in database"""
+    with db.connection() as conn:
+        result = conn.execute("SELECT password FROM users WHERE username = ?", (username,)).fetchone()
+
+    if result:
+        return verify_password(result[0], password)
+    return False
+
+
+def get_user_info(username):
+    """Get user details from database"""
+    with db.connection() as conn:
+        result = conn.execute(
+            "SELECT id, username, name, email, role, community FROM users WHERE username = ?", (username,)
+        ).fetchone()
+
+    if result:
+        return {
+            "id": result[0],
+            "username": result[1],
+            "name": result[2],
+            "email": result[3],
+            "role": result[4],
+            "community": result[5]
+        }
+    return None
+
+
+def update_user_profile(user_id, name=None, email=None, role=None, community=None, password=None):
+    """Update user profile information in the database"""
+    update_fields = []
+    params = []
+
+    # Build the update query based on which fields are provided
+    if name is not None:
+        update_fields.append("name = ?")
+        params.append(name)
+    if email is not None:
+        update_fields.append("email = ?")
+        params.append(email)
+    if role is not None:
+        update_fields.append("role = ?")
+        params.append(role)
+    if community is not None:
+        update_fields.append("community = ?")
+        params.append(community)
+    if password is not None:
+        update_fields.append("password = ?")
+        params.append(hash_password(password))
+
+    # If there are no fields to update
+    if not update_fields:
+        return False
+
+    # Add user_id to the params
+    params.append(user_id)
+
+    query = f"UPDATE users SET {', '.join(update_fields)} WHERE id = ?"
+
+    try:
+        with db.transaction() as conn:
+            conn.execute(query, params)
+        return True
+    except sqlite3.IntegrityError as e:
+        # Most likely due to duplicate email
+        print(f"Database update error: {e}")
+        return False
+    except sqlite3.OperationalError as e:
+        # Handle locked database
+        print(f"Database update error: {e}")
+        return False
@@ -0,0 +1,100 @@
+"""The shared HTTP client against a local stub server."""
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from plantspeak import http_client
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Keep connections open between requests, as web services do
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests[self.path] += 1
+            seen = self.server.requests[self.path]
+        if self.path == '/down' or (self.path == '/flaky' and seen == 1):
+            status = 503
+        else:
+            status = 200
+        body = b'{}'
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    stub = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    stub.lock = threading.Lock()
+    stub.connections = 0
+    stub.requests = Counter()
+    thread = threading.Thread(target=stub.serve_forever, daemon=True)
+    thread.start()
+    yield stub
+    stub.shutdown()
+    stub.server_close()
+
+
+@pytest.fixture(autouse=True)
+def fresh_client(monkeypatch):
+    """A new session and circuit breakers for each test, retrying without waiting"""
+    monkeypatch.setattr(http_client, 'BACKOFF_FACTOR', 0)
+    monkeypatch.setattr(http_client, '_sessions', {})
+    monkeypatch.setattr(http_client, '_breakers', {})
+    monkeypatch.setattr(http_client, '_histograms', {})
+    yield
+    for session in http_client._sessions.values():
+        session.close()
+
+
+def url(server, path):
+    return f'http://127.0.0.1:{server.server_address[1]}{path}'
+
+
+def test_connections_are_reused(server):
+    for _ in range(3):
+        assert http_client.get(url(server, '/ok'), timeout=5).status_code == 200
+
+    assert server.requests['/ok'] == 3
+    assert server.connections == 1
+
+
+def test_service_unavailable_is_retried(server):
+    response = http_client.get(url(server, '/flaky'), timeout=5)
+
+    assert response.status_code == 200
+    assert server.requests['/flaky'] == 2
+    assert http_client.stats()[f'127.0.0.1:{server.server_address[1]}/flaky']['circuit'] == 'closed'
+
+
+def test_rate_limited_calls_are_not_resent(server):
+    response = http_client.get(url(server, '/flaky'), rate_limited=True, timeout=5)
+
+    assert response.status_code == 503
+    assert server.requests['/flaky'] == 1
+
+
+def test_circuit_opens_after_repeated_failures(server):
+    for _ in range(http_client.FAILURE_THRESHOLD):
+        assert http_client.get(url(server, '/down'), endpoint='down', timeout=5).status_code == 503
+    requests_made = server.requests['/down']
+    assert requests_made == http_client.FAILURE_THRESHOLD * (http_client.RETRIES + 1)
+
+    with pytest.raises(http_client.CircuitOpenError):
+        http_client.get(url(server, '/down'), endpoint='down', timeout=5)
+    assert server.requests['/down'] == requests_made
+    assert http_client.stats()['down']['circuit'] == 'open'
@@ -0,0 +1,42 @@
+"""The sign-in page must load without the heavy libraries the other pages use."""
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ['pandas', 'PIL', 'numpy', 'requests', 'pydeck']
+# Microseconds PlantSpeak's own modules may take to import, Streamlit aside
+OWN_IMPORT_BUDGET = 250_000
+
+
+def import_times(module):
+    """{module name: (self, cumulative microseconds)} from python -X importtime"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, check=True, cwd=ROOT,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+
+@pytest.fixture(scope='module')
+def login_import():
+    return import_times('plantspeak.pages.login')
+
+
+@pytest.mark.parametrize('heavy', HEAVY_MODULES)
+def test_login_page_does_not_import(login_import, heavy):
+    loaded = [name for name in login_import if name == heavy or name.startswith(heavy + '.')]
+    assert not loaded, loaded
+
+
+def test_login_page_imports_quickly(login_import):
+    own = sum(own for name, (own, _) in login_import.items() if name.split('.')[0] == 'plantspeak')
+    assert own < OWN_IMPORT_BUDGET, f"PlantSpeak modules took {own / 1000:.0f} ms to import"
@@ -0,0 +1,43 @@
+"""Paging through the browse tab reaches every visible submission."""
+import pytest
+
+from plantspeak import db, submissions
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / 'plantspeak.db')
+    monkeypatch.setattr(db, 'DB_PATH', path)
+    db.migrate(path)
+    yield path
+    db.close_all()
+
+
+def add_submissions(path, times):
+    with db.transaction(path) as conn:
+        for n, submission_time in enumerate(times):
+            conn.execute(
+                "INSERT INTO submissions (id, plant_name, consent, submission_time) VALUES (?, 'neem', 'Yes', ?)",
+                (f's{n:03d}', submission_time)
+            )
+
+
+def all_pages(query, page_size):
+    ids = []
+    cursor = None
+    while True:
+        rows, cursor = submissions.fetch_page(query, cursor, page_size)
+        ids.extend(row['id'] for row in rows)
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize('page_size', [1, 2, 3, 10])
+def test_pages_include_submissions_without_a_time(db_path, page_size):
+    add_submissions(db_path, ['2025-01-01 10:00:00', None, '2025-01-02 10:00:00', None, '2025-01-03 10:00:00'])
+    query = submissions.SubmissionQuery()
+
+    ids = all_pages(query, page_size)
+
+    assert ids == ['s004', 's002', 's000', 's003', 's001']
+    assert submissions.count(query) == len(ids)
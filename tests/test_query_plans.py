@@ -0,0 +1,36 @@
+"""The browse tab's newest-first pages must be read from the time indexes."""
+import pytest
+
+from plantspeak import db, submissions
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'plantspeak.db')
+    db.migrate(path)
+    yield path
+    db.close_all()
+
+
+def query_plan(path, sql, params):
+    with db.connection(path) as conn:
+        return [row['detail'] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params)]
+
+
+QUERIES = {
+    'anonymous': lambda: submissions.SubmissionQuery(),
+    'logged in': lambda: submissions.SubmissionQuery(1),
+    'only mine': lambda: submissions.SubmissionQuery(1).mine(),
+    'category': lambda: submissions.SubmissionQuery(1).category('Medicinal'),
+    'tag': lambda: submissions.SubmissionQuery().tag('fever'),
+}
+
+
+@pytest.mark.parametrize('cursor', [None, ('2025-01-01 10:00:00', 's001')], ids=['first page', 'next page'])
+@pytest.mark.parametrize('name', QUERIES)
+def test_newest_page_uses_time_indexes(db_path, name, cursor):
+    sql, params = submissions._newest_page_sql(QUERIES[name](), cursor, 10)
+    plan = query_plan(db_path, sql, params)
+
+    assert not any(detail.startswith('SCAN s') for detail in plan), plan
+    assert not any('USE TEMP B-TREE' in detail for detail in plan), plan